@@ -0,0 +1,53 @@
+"""
+Import cost of pycek_public, measured with ``python -X importtime``.
+
+Each scenario runs in a fresh interpreter. "everything" resolves every
+public name, which is what ``import pycek_public`` used to do when the
+package star-imported all of its modules.
+
+    python benchmarks/import_time.py
+"""
+import subprocess
+import sys
+
+SCENARIOS = {
+    "import only": "import pycek_public",
+    "crystal violet lab": "import pycek_public as cek; cek.crystal_violet()",
+    "stats lab": "import pycek_public as cek; cek.stats_lab()",
+    "plotting": "import pycek_public as cek; cek.plotting",
+    "Raman fitter": "import pycek_public as cek; cek.RamanFitter",
+    "everything": "import pycek_public as cek; [getattr(cek, n) for n in cek.__all__]",
+}
+
+HEAVY = ["matplotlib.pyplot", "scipy.optimize", "scipy.integrate", "scipy.stats", "colorama"]
+
+
+def measure(code, repeat=5):
+    """Return the best cumulative import time (ms) over *repeat* runs and the modules loaded."""
+    best = None
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, check=True,
+        )
+        total = 0
+        modules = set()
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            modules.add(name.strip())
+            # Top-level entries are not indented; their cumulative times add up to the total
+            if not name.startswith("  "):
+                total += int(cumulative)
+        if best is None or total < best[0]:
+            best = (total, modules)
+    return best[0] / 1000, best[1]
+
+
+if __name__ == "__main__":
+    print(f"{'scenario':>20} {'time (ms)':>10}  heavy modules loaded")
+    for label, code in SCENARIOS.items():
+        ms, modules = measure(code)
+        heavy = ", ".join(m for m in HEAVY if m in modules) or "-"
+        print(f"{label:>20} {ms:>10.1f}  {heavy}")
@@ -0,0 +1,64 @@
+"""
+Cost of the y post-processing in cek_labs.generate_data_from_function
+(background, noise, positive clipping and rounding) before and after it was
+turned into an in-place NumPy pipeline.
+
+Both versions use the same random numbers, and their results are checked
+to be identical before timing.
+
+    python benchmarks/positive_clipping.py
+"""
+import timeit
+
+import numpy as np
+
+import pycek_public as cek
+
+SIZES = [10**3, 10**4, 10**5, 10**6, 10**7]
+
+
+def _exponential(x, A, k):
+    return A * np.exp(-k * x)
+
+
+def legacy(lab, x, params, noise_level, background):
+    """The list-comprehension version replaced by the in-place pipeline."""
+    y = _exponential(x, **params)
+    y = y + background
+    y = y + lab._generate_noise(len(x), noise_level)
+    eps = np.power(10.0, -lab.precision)
+    y = np.array([max(eps, abs(v)) for v in y])
+    return np.column_stack((x, lab._round_values(y)))
+
+
+def current(lab, x, params, noise_level, background):
+    return lab.generate_data_from_function(
+        _exponential, params, len(x), xrange=(x[0], x[-1]), xspacing="linear",
+        noise_level=noise_level, background=background, positive=True,
+    )
+
+
+def best_time(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number
+
+
+def main():
+    lab = cek.crystal_violet()
+    params = {"A": 1.0, "k": 0.5}
+    print(f"{'points':>10} {'legacy (ms)':>12} {'in place (ms)':>14} {'speedup':>8}")
+    for n in SIZES:
+        x = np.linspace(0.0, 20.0, n)
+
+        np.random.seed(0)
+        expected = legacy(lab, x, params, 0.01, 0.001)
+        np.random.seed(0)
+        assert np.array_equal(expected, current(lab, x, params, 0.01, 0.001))
+
+        number = max(1, 10**6 // n)
+        t_legacy = best_time(lambda: legacy(lab, x, params, 0.01, 0.001), max(1, number // 10))
+        t_current = best_time(lambda: current(lab, x, params, 0.01, 0.001), number)
+        print(f"{n:>10} {1e3 * t_legacy:>12.3f} {1e3 * t_current:>14.3f} {t_legacy / t_current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Drive many concurrent marimo sessions against a running server.
+
+Each simulated student loads the notebook page, opens the session websocket
+(which makes marimo start a kernel and run every cell) and waits until the
+kernel has been quiet for --idle seconds. Compare the throughput reported
+with PYCEK_WORKERS=1 and with several workers, e.g.
+
+    PYCEK_WORKERS=1 ./start.sh    # in one terminal
+    python loadtest.py --sessions 40 --concurrency 20
+    PYCEK_WORKERS=4 ./start.sh
+    python loadtest.py --sessions 40 --concurrency 20
+
+Requires the websockets package, which marimo already depends on.
+"""
+import argparse
+import asyncio
+import secrets
+import statistics
+import time
+import urllib.request
+
+import websockets
+
+
+async def fetch(url):
+    def _get():
+        with urllib.request.urlopen(url) as response:
+            return response.read()
+    return await asyncio.to_thread(_get)
+
+
+async def run_session(base_url, app, idle, timeout):
+    """Run one session and return (page load time, time until the kernel settled, messages)."""
+    start = time.perf_counter()
+    await fetch(f"{base_url}/{app}/")
+    page_time = time.perf_counter() - start
+
+    session_id = "s_" + secrets.token_hex(3)
+    ws_url = base_url.replace("http", "ws", 1) + f"/{app}/ws?session_id={session_id}"
+
+    messages = 0
+    async with websockets.connect(ws_url, max_size=None) as ws:
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            try:
+                await asyncio.wait_for(ws.recv(), timeout=idle)
+            except asyncio.TimeoutError:
+                break
+            messages += 1
+    # The idle wait at the end is not part of the work done by the server
+    settled_time = time.perf_counter() - start - idle
+    return page_time, settled_time, messages
+
+
+async def main(args):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results = {app: [] for app in args.apps}
+    failures = 0
+
+    async def worker(app):
+        nonlocal failures
+        async with semaphore:
+            try:
+                results[app].append(await run_session(args.url, app, args.idle, args.timeout))
+            except Exception as e:
+                failures += 1
+                print(f"{app}: session failed ({e})")
+
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        worker(args.apps[i % len(args.apps)]) for i in range(args.sessions)
+    ])
+    elapsed = time.perf_counter() - start
+
+    print(f"{'app':>8} {'sessions':>9} {'page (s)':>9} {'median (s)':>11} {'p95 (s)':>8} {'messages':>9}")
+    for app, res in results.items():
+        if not res:
+            continue
+        pages = [r[0] for r in res]
+        settled = sorted(r[1] for r in res)
+        p95 = settled[min(len(settled) - 1, int(0.95 * len(settled)))]
+        print(
+            f"{app:>8} {len(res):>9} {statistics.median(pages):>9.3f} "
+            f"{statistics.median(settled):>11.3f} {p95:>8.3f} {statistics.mean(r[2] for r in res):>9.1f}"
+        )
+
+    done = sum(len(r) for r in results.values())
+    print(f"\n{done} sessions in {elapsed:.1f} s ({done / elapsed:.2f} sessions/s), {failures} failed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the server")
+    parser.add_argument("--apps", nargs="+", default=["bc", "cv", "raman"], help="Notebook paths to exercise")
+    parser.add_argument("--sessions", type=int, default=30, help="Total number of sessions")
+    parser.add_argument("--concurrency", type=int, default=10, help="Sessions running at the same time")
+    parser.add_argument("--idle", type=float, default=2.0, help="Seconds without messages before a session is done")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Maximum duration of a session")
+    asyncio.run(main(parser.parse_args()))
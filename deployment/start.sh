@@ -0,0 +1,50 @@
+#!/usr/bin/env bash
+# Start the marimo server.
+#
+# PYCEK_WORKERS (default 1) sets the number of server processes. With more
+# than one, each worker listens on a local port and nginx listens on PORT,
+# routing every request of a marimo session to the same worker.
+#
+# PYCEK_POOL_WORKERS (default: number of CPUs / PYCEK_WORKERS, at least 1)
+# sets the size of the process pool of each server process, so that all the
+# pools together start about one data-generation process per CPU.
+
+set -euo pipefail
+
+cd "$(dirname "$0")"
+
+WORKERS="${PYCEK_WORKERS:-1}"
+PORT="${PORT:-8000}"
+
+if [ -z "${PYCEK_POOL_WORKERS:-}" ]; then
+    cpus="$(nproc)"
+    PYCEK_POOL_WORKERS=$(( cpus / WORKERS > 1 ? cpus / WORKERS : 1 ))
+fi
+export PYCEK_POOL_WORKERS
+
+if [ "$WORKERS" -le 1 ]; then
+    exec env PYCEK_PORT="$PORT" python app.py
+fi
+
+upstreams=""
+pids=()
+for i in $(seq 1 "$WORKERS"); do
+    worker_port=$((PORT + i))
+    PYCEK_HOST=127.0.0.1 PYCEK_PORT="$worker_port" python app.py &
+    pids+=($!)
+    upstreams+="        server 127.0.0.1:${worker_port} max_fails=0;"$'\n'
+done
+
+trap 'kill "${pids[@]}" 2>/dev/null || true' EXIT INT TERM
+
+conf=/tmp/pycek-nginx.conf
+sed -e "s/@PORT@/${PORT}/" nginx.conf.template \
+    | awk -v upstreams="$upstreams" '{ if ($0 == "@UPSTREAMS@") printf "%s", upstreams; else print }' \
+    > "$conf"
+
+nginx -c "$conf" -g "daemon off;" &
+pids+=($!)
+
+# Stop everything as soon as any process exits
+wait -n
+exit 1
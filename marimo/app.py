@@ -1,30 +1,128 @@
 from typing import Annotated, Callable, Coroutine
 import marimo
 from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
-from fastapi import FastAPI, Form, Request, Response
+from fastapi import FastAPI, Form, HTTPException, Request, Response
+import asyncio
+import gzip
+import hashlib
 import mimetypes
 import os
+import time
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CachedPage:
+    """
+    HTML page served from memory.
+
+    The file is re-read only when its mtime changes, and the mtime itself is
+    checked at most every `check_interval` seconds, so repeated requests never
+    touch the disk. Gzip (and brotli, if installed) variants are compressed
+    once per reload, and conditional requests get a 304.
+    """
+    check_interval = 2.0
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.etag = None
+        self.last_modified = None
+        self.variants = {}
+        self._checked = 0.0
+        self._lock = asyncio.Lock()
+
+    def _load(self):
+        stat = os.stat(self.path)
+        if stat.st_mtime_ns == self.mtime:
+            return
+        with open(self.path, 'rb') as f:
+            body = f.read()
+
+        variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body)
+
+        # Weak ETag: all the encodings share it as they carry the same page
+        self.etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.variants = variants
+        self.mtime = stat.st_mtime_ns
+
+    def _is_stale(self):
+        return self.mtime is None or time.monotonic() - self._checked > self.check_interval
+
+    async def refresh(self):
+        if not self._is_stale():
+            return
+        async with self._lock:
+            if self._is_stale():
+                await asyncio.to_thread(self._load)
+                self._checked = time.monotonic()
+
+    def _not_modified(self, request):
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags or self.etag[2:] in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.mtime // 1_000_000_000) <= since
+        return False
+
+    def _encoding(self, request):
+        accepted = {}
+        for item in request.headers.get("accept-encoding", "").split(","):
+            name, _, params = item.strip().partition(";")
+            q = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    q = float(params.strip()[2:])
+                except ValueError:
+                    q = 0.0
+            accepted[name.strip().lower()] = q
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepted.get(encoding, 0.0) > 0:
+                return encoding
+        return "identity"
+
+    async def response(self, request):
+        await self.refresh()
+        headers = {
+            "ETag": self.etag,
+            "Last-Modified": self.last_modified,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if self._not_modified(request):
+            return Response(status_code=304, headers=headers)
+
+        encoding = self._encoding(request)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(self.variants[encoding], media_type="text/html", headers=headers)
+
+
+index_page = CachedPage('index.html')
+calendar_page = CachedPage('calendar.html')
+
 # Create a FastAPI app
 app = FastAPI()
 
 # Index route that serves the HTML file
 @app.get("/", response_class=HTMLResponse)
-async def read_root():
-    with open('index.html', 'r', encoding='utf-8') as f:
-        return f.read()
-
-# Create a marimo asgi app with all routes
-marimo_server = (
-    marimo.create_asgi_app()
-    .with_app(path="/bc", root="./bomb_calorimetry.py")
-    .with_app(path="/cv", root="./crystal_violet.py")
-    .with_app(path="/stats", root="./statistics_lab.py")
-    .with_app(path="/eq", root="./equilibrium.py")
-    .with_app(path="/surface", root="./surface_adsorption.py")
-    .with_app(path="/raman", root="./raman.py")
-)
+async def read_root(request: Request):
+    return await index_page.response(request)
 
 def get_media_type(file_name: str):
     mime_type, _ = mimetypes.guess_type(file_name)
@@ -33,7 +131,8 @@ def get_media_type(file_name: str):
 @app.get("/download-file/{file_name}")
 async def download_file(file_name: str):
     file_path = f"./docs/{file_name}"
-    if os.path.exists(file_path):
+    # Only serve files that live directly in ./docs, and never block the event loop on the check
+    if os.path.basename(file_name) == file_name and await asyncio.to_thread(os.path.isfile, file_path):
         # For example:
         # For "document.pdf" - media_type would be "application/pdf"
         # For "document.docx" - media_type would be "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
@@ -60,9 +159,8 @@ async def download_file(file_name: str):
 #    return {"error": f"Document not found [./docs/{file_name}]"}, 404
 
 @app.get("/calendar", response_class=HTMLResponse)
-async def read_root():
-    with open('calendar.html', 'r', encoding='utf-8') as f:
-        return f.read()
+async def read_calendar(request: Request):
+    return await calendar_page.response(request)
 
 
 ## Custom route to serve HTML files that open in a new tab
@@ -92,12 +190,32 @@ async def read_root():
 #    return html_content, 200, headers
 
 
-# Mount the marimo server at the root
-# This will handle all the routes defined in the marimo server
-app.mount("", marimo_server.build())
+# The workers of the pycek process pool import this module again, as
+# __mp_main__, and must not build the marimo server; any other import (e.g.
+# "uvicorn app:app") gets the complete app
+if __name__ != "__mp_main__":
+    # Create a marimo asgi app with all routes
+    marimo_server = (
+        marimo.create_asgi_app()
+        .with_app(path="/bc", root="./bomb_calorimetry.py")
+        .with_app(path="/cv", root="./crystal_violet.py")
+        .with_app(path="/stats", root="./statistics_lab.py")
+        .with_app(path="/eq", root="./equilibrium.py")
+        .with_app(path="/surface", root="./surface_adsorption.py")
+        .with_app(path="/raman", root="./raman.py")
+    )
+
+    # Mount the marimo server at the root
+    # This will handle all the routes defined in the marimo server
+    app.mount("", marimo_server.build())
 
 # Run the server
+# A single process is started here; deployment/start.sh runs PYCEK_WORKERS of
+# them behind nginx, which keeps every marimo session on the same worker
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
-
+    uvicorn.run(
+        app,
+        host=os.environ.get("PYCEK_HOST", "0.0.0.0"),
+        port=int(os.environ.get("PYCEK_PORT", 8000)),
+    )
@@ -73,7 +73,7 @@ def _(lab, mo):
 
 
 @app.cell
-def _(cek, lab, mo, reset_button, run_button, sample_selector):
+async def _(cek, lab, mo, reset_button, run_button, sample_selector):
     if reset_button.value:
         lab.ID = 0
         lab._set_filename(None)
@@ -89,7 +89,7 @@ def _(cek, lab, mo, reset_button, run_button, sample_selector):
         mo.stop(sample_selector.value is None, mo.md(f"### No sample selected !!"))
 
         lab.set_parameters(sample=sample_selector.value)
-        data = lab.create_data_for_lab()
+        data = await lab.acreate_data_for_lab()
         file_content = lab.write_data_to_string()
 
         fname = lab.output_file
@@ -109,7 +109,7 @@ def _(cek, lab, mo, reset_button, run_button, sample_selector):
         )
 
         plot = cek.plotting()
-        image = plot.quick_plot(scatter=data, output="marimo")
+        image = mo.image(await plot.aquick_plot(scatter=data, output="png"))
 
     mo.hstack([mo.vstack([mo.md(message), download_button]), image])
     return (
@@ -100,7 +100,7 @@ def _(lab, mo):
 
 
 @app.cell
-def _(
+async def _(
     cek,
     cv_volume,
     h2o_volume,
@@ -132,7 +132,7 @@ def _(
             volumes={"cv": cv_vol, "oh": oh_vol, "h2o": h2o_vol},
             temperature=temperature.value + 273.15,
         )
-        data = lab.create_data_for_lab()
+        data = await lab.acreate_data_for_lab()
         file_content = lab.write_data_to_string()
 
         fname = lab.output_file
@@ -152,7 +152,7 @@ def _(
         )
 
         plot = cek.plotting()
-        image = plot.quick_plot(scatter=data, output="marimo")
+        image = mo.image(await plot.aquick_plot(scatter=data, output="png"))
 
     mo.hstack([mo.vstack([mo.md(message), download_button]), image])
     return (
@@ -13,11 +13,13 @@ def _():
     from typing import Dict
     from numpy.typing import NDArray
 
+    import pycek_public as cek
+
     nspecies = mo.ui.number(2,10,value=2,label="Number of species")
     mo.vstack([
         mo.md("#**Numerical Solution of Equilibrium Problems**").center(),
         nspecies],gap=2)
-    return Dict, NDArray, copy, mo, np, nspecies, plt
+    return Dict, NDArray, cek, copy, mo, np, nspecies, plt
 
 
 @app.cell
@@ -112,16 +114,17 @@ def _(mo, np):
     check_1 = mo.ui.checkbox(label= f"Decrease $\delta c$",)
     check_2 = mo.ui.checkbox(label= f"Increase $\delta c$",)
     check_3 = mo.ui.checkbox(label= f"Positive [C]",)
+    newton = mo.ui.checkbox(label= f"Newton solver",)
     mo.vstack([
         mo.md("##**Optimisation parameters**").center(),
-        mo.hstack([check_1,check_2,check_3],align="start",justify="space-around"),
+        mo.hstack([check_1,check_2,check_3,newton],align="start",justify="space-around"),
         mo.hstack([
             step, 
             max_iterations,
             tol,]
         ,align="start",justify="space-around")
     ])
-    return check_0, check_1, check_2, check_3, max_iterations, step, tol
+    return check_0, check_1, check_2, check_3, max_iterations, newton, step, tol
 
 
 @app.cell
@@ -160,6 +163,7 @@ def _(check_3, np):
 def _(
     Dict,
     NDArray,
+    cek,
     check_1,
     check_2,
     compute_force,
@@ -187,41 +191,39 @@ def _(
             max_iterations: Maximum number of iterations before stopping
 
         Returns:
-            NDArray: Array with columns [iteration, conc_A, conc_B, force]
+            Concentrations, forces and step sizes at the recorded iterations,
+            and the iteration numbers of the records
         """
-        # Initialize arrays to store results
+        # Record a bounded, log-spaced history of the iterations
         ns = len(initial_conc)
-
-        conc = np.zeros(shape=(max_iterations + 1, ns))
-        forces = np.zeros(shape=(max_iterations + 1,1))
-        delta = np.zeros(shape=(max_iterations + 1,1))
+        trace = cek.IterationTrace(max_iterations, ns + 2)
 
         # Set initial values
-        conc[0,:] = np.array(initial_conc)
-        forces[0] = compute_force(conc[0,:], stoichiometry, pK_eq)
-        delta[0] = dc
+        conc = np.array(initial_conc, dtype=float)
+        force = compute_force(conc, stoichiometry, pK_eq)
+        trace.record(0, np.concatenate([conc, [force, dc]]))
 
         # Iterate until convergence or max iterations
         for i in range(max_iterations):
             # Update values
-            conc[i+1,:] , dc = update_concentrations(conc[i,:], stoichiometry, forces[i,0], dc)
-            forces[i+1] = compute_force(conc[i+1,:], stoichiometry, pK_eq)
+            conc, dc = update_concentrations(conc, stoichiometry, force, dc)
+            new_force = compute_force(conc, stoichiometry, pK_eq)
 
-            if check_1.value and forces[i+1]*forces[i] < 0:
+            if check_1.value and new_force*force < 0:
                     dc /=2
 
-            if check_2.value and forces[i+1]*forces[i] > 0:
+            if check_2.value and new_force*force > 0:
                     dc *= 1.5
 
-            delta[i+1] = dc
+            force = new_force
+            trace.record(i + 1, np.concatenate([conc, [force, dc]]))
 
             # Check convergence
-            if np.abs(forces[i+1]) < rtol:
-                # Trim unused array space if converged early
-                return conc[:i+2,:], forces[:i + 2], delta[:i + 2]
+            if np.abs(force) < rtol:
+                break
 
-        # Return all iterations if no convergence
-        return conc[:i+2,:], forces[:i + 2], delta[:i + 2]
+        iterations, history = trace.arrays()
+        return history[:, :ns], history[:, ns:ns + 1], history[:, ns + 1:], iterations
 
     def plot(x,data,labels=None,refs=None,log=False,axes=None):
         colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
@@ -253,22 +255,40 @@ def _(
 
 
 @app.cell
-def _(compounds, keq, max_iterations, np, plot, solve_equilibrium, step, tol):
+def _(
+    cek,
+    compounds,
+    keq,
+    max_iterations,
+    newton,
+    np,
+    plot,
+    solve_equilibrium,
+    step,
+    tol,
+):
     def execute(conc_list,stoich_list):
         pkeq = -np.log10(float(keq.value))
         dc = float(step.value)
         rtol = float(tol.value)
 
-        final_conc_list, forces, deltas = \
-            solve_equilibrium(
-                conc_list,
-                stoich_list,
-                pkeq,
-                dc,
-                rtol,
-                max_iterations=int(max_iterations.value))
-
-        cycles = np.linspace(0,len(forces),len(forces))
+        if newton.value:
+            final_conc_list, forces, deltas, cycles = \
+                cek.solve_equilibrium(
+                    conc_list,
+                    stoich_list,
+                    float(keq.value),
+                    rtol,
+                    max_iterations=int(max_iterations.value))
+        else:
+            final_conc_list, forces, deltas, cycles = \
+                solve_equilibrium(
+                    conc_list,
+                    stoich_list,
+                    pkeq,
+                    dc,
+                    rtol,
+                    max_iterations=int(max_iterations.value))
 
         logscale = False
         if any(final_conc_list[-1,:] < 1e-2):
@@ -343,6 +363,35 @@ def _(
     return final_0, final_1, stoich_list
 
 
+@app.cell
+def _(cek, compounds, concentrations, keq, mo, np, plt, stoichiometry):
+    # Equilibrium over a grid of K and initial concentration of the first species
+    _nu = np.array(stoichiometry.value, dtype=float)
+    _c0 = np.array(concentrations.value, dtype=float)
+    _K = float(keq.value)
+
+    _Ks = np.logspace(np.log10(_K) - 3, np.log10(_K) + 3, 120)
+    _c_first = np.linspace(0, 2 * _c0[0] if _c0[0] > 0 else 1.0, 120)
+
+    _grid = np.broadcast_to(_c0, (len(_c_first), len(_Ks), len(_c0))).copy()
+    _grid[..., 0] = _c_first[:, None]
+    _conc, _converged = cek.solve_equilibrium_batch(_grid, _nu, _Ks[None, :])
+
+    _product = int(np.argmax(_nu > 0))
+    plt.figure(figsize=(5, 4))
+    plt.pcolormesh(np.log10(_Ks), _c_first, _conc[..., _product], shading="auto")
+    plt.colorbar(label=f"[{compounds.value[_product]}]$_{{eq}}$")
+    plt.xlabel("log$_{10}$ K")
+    plt.ylabel(f"[{compounds.value[0]}]$_0$")
+    grid_plot = plt.gca()
+
+    mo.vstack([
+        mo.md("##**Equilibrium map**").center(),
+        grid_plot,
+    ])
+    return (grid_plot,)
+
+
 @app.cell
 def _():
     return
@@ -253,7 +253,7 @@ def _(
 
 
 @app.cell
-def _(
+async def _(
     cek,
     filename,
     fitting_parameters,
@@ -303,7 +303,7 @@ def _(
         if current_fit_results is None or current_fit_results.get('trigger') != get_fit_trigger():
             pp = get_peak_positions()
             print("Running fit with positions:", pp)
-            popt = fitter.fit(
+            popt = await fitter.afit(
                 n_peaks=fitting_parameters['npeaks'],
                 freq_range=freq_range,
                 peak_positions=pp,
@@ -337,7 +337,7 @@ def _(
 
         if fit_results is not None and fit_results.get('fitted'):
             # # Need to re-run the fit to populate the fitter object for plotting
-            popt = fitter.fit(
+            popt = await fitter.afit(
                 n_peaks=fitting_parameters['npeaks'],
                 freq_range=freq_range,
                 peak_positions=pp,
@@ -408,15 +408,10 @@ def _(
 
 
 @app.cell
-def _(image, mo):
-    import io
-    import base64
-
+def _(cek, image, mo):
     def download_plot():
-        buf = io.BytesIO()
-        image.savefig(buf, format='png', dpi=300, bbox_inches='tight')
-        buf.seek(0)
-        return buf.getvalue()
+        # Rendered once per figure, repeated clicks reuse the cached bytes
+        return cek.figure_to_bytes(image, "png", dpi=300, bbox_inches='tight')
 
     download_button = mo.download(
         data=download_plot,
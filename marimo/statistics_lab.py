@@ -76,7 +76,7 @@ def _(cek, lab, mo):
 
 
 @app.cell
-def _(cek, lab, mo, reset_button, run_button, sample_selector, student_ID):
+async def _(cek, lab, mo, reset_button, run_button, sample_selector, student_ID):
     if reset_button.value:
         lab.ID = 0
         lab.output_file = None
@@ -97,7 +97,7 @@ def _(cek, lab, mo, reset_button, run_button, sample_selector, student_ID):
         mo.stop(sample_selector.value is None, mo.md("### No sample selected !!"))
 
         lab.set_parameters(number_of_values=12, sample=sample_selector.value)
-        data = lab.create_data_for_lab()
+        data = await lab.acreate_data_for_lab()
         file_content = lab.write_data_to_string()
 
         fname = lab.output_file
@@ -117,7 +117,7 @@ def _(cek, lab, mo, reset_button, run_button, sample_selector, student_ID):
         )
 
         plot = cek.plotting()
-        image = plot.quick_plot(scatter=data, output="marimo")
+        image = mo.image(await plot.aquick_plot(scatter=data, output="png"))
     mo.hstack([mo.vstack([mo.md(message), download_button]), image])
     return (
         data,
@@ -74,7 +74,7 @@ def _(cek, lab, mo):
 
 
 @app.cell
-def _(cek, lab, mo, reset_button, run_button, student_ID, temperature):
+async def _(cek, lab, mo, reset_button, run_button, student_ID, temperature):
     if reset_button.value:
         lab.ID = 0
         lab.output_file = None
@@ -89,7 +89,7 @@ def _(cek, lab, mo, reset_button, run_button, student_ID, temperature):
         )
 
         lab.set_parameters(temperature=temperature.value + 273.15)
-        data = lab.create_data_for_lab()
+        data = await lab.acreate_data_for_lab()
         file_content = lab.write_data_to_string()
 
         fname = lab.output_file
@@ -109,7 +109,7 @@ def _(cek, lab, mo, reset_button, run_button, student_ID, temperature):
         )
 
         plot = cek.plotting()
-        image = plot.quick_plot(scatter=data, output="marimo")
+        image = mo.image(await plot.aquick_plot(scatter=data, output="png"))
 
     mo.hstack([mo.vstack([mo.md(message), download_button]), image])
     return (
@@ -1,12 +1,65 @@
-from .cek_labs import *
+import importlib
+import sys
+import types
 
-from .generate_random_filenames import *
-from .logger import *
+# Public names and the submodule defining them. Submodules are only imported
+# the first time one of their names is used (PEP 562), so e.g. the crystal
+# violet lab never pays for matplotlib or scipy.
+_exports = {
+    "cek_labs": ["set_ID", "cek_labs"],
 
-from .statistics_lab import *
-from .bomb_calorimetry import *
-from .crystal_violet import *
-from .surface_adsorption import *
+    "generate_random_filenames": ["TempFilenameGenerator"],
+    "file_manager": ["FileLifecycleManager", "get_file_manager"],
+    "parameters": ["Field", "LabParameters", "make_parameters"],
+    "metadata": ["Metadata"],
+    "archive": ["DatasetArchive"],
+    "columnar": ["dataset_to_arrow", "datasets_to_arrow", "write_parquet_batch", "read_parquet"],
+    "logger": ["VERBOSE", "RESULT", "ColoredFormatter", "ColoredLogger", "setup_logger"],
+    "executor": ["get_pool", "shutdown_pool", "run_in_pool"],
+    "seeding": ["derive_sample_ID", "fresh_sample_ID", "seed_global_rng"],
 
-from .plotting import *
-from .raman_fitter import *
+    "statistics_lab": ["stats_lab"],
+    "bomb_calorimetry": ["bomb_calorimetry"],
+    "crystal_violet": ["crystal_violet"],
+    "surface_adsorption": ["surface_adsorption"],
+
+    "equilibrium": [
+        "log10_quotient", "compute_force", "solve_equilibrium", "solve_equilibrium_batch",
+        "solve_reaction_network", "IterationTrace",
+    ],
+
+    "plotting": ["plotting", "figure_to_bytes"],
+    "raman_fitter": ["RamanFitter"],
+}
+
+_lazy = {name: module for module, names in _exports.items() for name in names}
+
+__all__ = sorted(_lazy)
+
+
+def __getattr__(name):
+    module_name = _lazy.get(name)
+    if module_name is None:
+        if name in _exports:
+            return importlib.import_module(f".{name}", __name__)
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_exports))
+
+
+class _Package(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it on the package, which would hide the
+        # class of the same name (e.g. pycek_public.crystal_violet)
+        if isinstance(value, types.ModuleType) and _lazy.get(name) == name:
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
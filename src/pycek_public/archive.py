@@ -0,0 +1,193 @@
+import io
+import json
+import os
+import queue
+import tarfile
+import threading
+import time
+import zipfile
+
+FORMATS = ("zip", "tar.gz", "tar.zst")
+
+
+def _zstandard():
+    """Import zstandard, which is an optional dependency."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "tar.zst archives require zstandard; install it with 'pip install zstandard'"
+        ) from e
+    return zstandard
+
+
+class _ZipSink:
+    def __init__(self, fileobj, level):
+        self.zip = zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=level)
+
+    def add(self, name, content):
+        self.zip.writestr(name, content)
+
+    def close(self):
+        self.zip.close()
+
+
+class _TarSink:
+    def __init__(self, fileobj, mode, level=None):
+        kwargs = {} if level is None else {"compresslevel": level}
+        self.tar = tarfile.open(fileobj=fileobj, mode=mode, **kwargs)
+        self.stream = None
+
+    def add(self, name, content):
+        info = tarfile.TarInfo(name)
+        info.size = len(content)
+        info.mtime = int(time.time())
+        self.tar.addfile(info, io.BytesIO(content))
+
+    def close(self):
+        self.tar.close()
+        if self.stream is not None:
+            self.stream.close()
+
+
+def _open_sink(fileobj, fmt, level):
+    if fmt == "zip":
+        return _ZipSink(fileobj, level)
+    if fmt == "tar.gz":
+        return _TarSink(fileobj, "w:gz", 9 if level is None else level)
+    if fmt == "tar.zst":
+        zstandard = _zstandard()
+        compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+        stream = compressor.stream_writer(fileobj, closefd=False)
+        # Streaming tar ("w|") never seeks, as required by the compressor
+        sink = _TarSink(stream, "w|")
+        sink.stream = stream
+        return sink
+    raise ValueError(f"format must be one of {FORMATS}, got {fmt!r}")
+
+
+def _writer_loop(pending, sink, errors):
+    """Compress queued (name, content) entries until the None sentinel."""
+    while True:
+        item = pending.get()
+        try:
+            if item is None:
+                return
+            if not errors:
+                sink.add(*item)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            pending.task_done()
+
+
+class DatasetArchive:
+    """
+    Single compressed archive collecting many datasets, with a manifest.
+
+    Entries are queued by add() and compressed into the archive by a
+    background thread, so generating the next dataset overlaps with
+    compressing the previous ones. Everything is streamed to the target
+    file or file object; no temporary files are written.
+
+    A "manifest.json" entry listing every dataset (name, size in bytes and
+    metadata) is added when the archive is closed.
+    """
+    def __init__(self, target, format="zip", compresslevel=None, max_pending=64):
+        """
+        Open the archive.
+
+        Args:
+            target (str or file object): Path of the archive, or a writable binary file object
+            format (str): "zip", "tar.gz" or "tar.zst" (requires zstandard) (default: "zip")
+            compresslevel (int): Compression level (default: the format's default)
+            max_pending (int): Entries queued before add() blocks (default: 64)
+
+        Example:
+            with DatasetArchive("cohort.zip") as archive:
+                for student_ID in students:
+                    lab.set_student_ID(student_ID)
+                    lab.create_data_for_lab()
+                    lab.add_to_archive(archive)
+        """
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}, got {format!r}")
+        self.format = format
+
+        if isinstance(target, (str, os.PathLike)):
+            self._fileobj = open(target, "wb")
+            self._owns_file = True
+        else:
+            self._fileobj = target
+            self._owns_file = False
+
+        self.manifest = []
+        self._names = set()
+        self._errors = []
+        self._closed = False
+        try:
+            self._sink = _open_sink(self._fileobj, format, compresslevel)
+        except Exception:
+            if self._owns_file:
+                self._fileobj.close()
+            raise
+
+        self._pending = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(
+            target=_writer_loop,
+            args=(self._pending, self._sink, self._errors),
+            name="pycek-archive-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def add(self, name, content, metadata=None):
+        """
+        Queue one entry for the archive.
+
+        Args:
+            name (str): Name of the entry inside the archive (must be unique)
+            content (str or bytes): Content of the entry (text is stored as UTF-8)
+            metadata (dict): Metadata recorded for the entry in the manifest
+        """
+        if self._closed:
+            raise ValueError("Archive is closed")
+        self._raise_errors()
+        if name in self._names or name == "manifest.json":
+            raise ValueError(f"Duplicate archive entry: {name!r}")
+
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self._names.add(name)
+        self.manifest.append({
+            "name": name,
+            "size": len(content),
+            "metadata": {str(k): str(v) for k, v in (metadata or {}).items()},
+        })
+        self._pending.put((name, content))
+
+    def close(self):
+        """Write the manifest, wait for the background thread and finish the archive."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            manifest = json.dumps({"format": self.format, "entries": self.manifest}, indent=1)
+            self._pending.put(("manifest.json", manifest.encode("utf-8")))
+            self._pending.put(None)
+            self._thread.join()
+            self._raise_errors()
+            self._sink.close()
+        finally:
+            if self._owns_file:
+                self._fileobj.close()
+
+    def _raise_errors(self):
+        if self._errors:
+            raise RuntimeError("Writing the archive failed") from self._errors[0]
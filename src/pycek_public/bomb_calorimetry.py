@@ -1,9 +1,18 @@
+import numbers
+
 import pycek_public as cek
 import numpy as np
 import pprint as pp
 
 
 class bomb_calorimetry(cek.cek_labs):
+    parameter_fields = {
+        "ignition_time": cek.Field(20, numbers.Integral, minimum=0),
+        "relaxation_time": cek.Field(3, numbers.Real, minimum=0, positive=True),
+        "slope_before": cek.Field(0.0, numbers.Real),
+        "slope_after": cek.Field(0.0, numbers.Real),
+    }
+
     def setup_lab(self):
         """
         Define base information for the lab
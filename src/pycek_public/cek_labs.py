@@ -1,7 +1,14 @@
-import time
+import contextlib
+import functools
+import gzip
+import itertools
+import numbers
+import operator
+import os
+import weakref
 from abc import ABC, abstractmethod
 from collections import OrderedDict
-from io import StringIO
+from io import BufferedIOBase, BytesIO, RawIOBase, StringIO
 from pathlib import Path
 from typing import Callable, Dict, Optional, Tuple
 
@@ -24,14 +31,169 @@ def set_ID(mo, lab, value):
         print(mo.md(f"### Invalid Student ID: {value}"))
 
 
+def _create_data_in_worker(lab, sample_ID, attempt=None):
+    """Generate a dataset in a pool worker and send back the updated lab state."""
+    data = lab.create_data_for_lab(sample_ID=sample_ID, attempt=attempt)
+    return data, lab.__getstate__()
+
+
+# Keys of the labs' sessions in the process-wide file manager
+_session_IDs = itertools.count(1)
+
+
+@functools.lru_cache(maxsize=64)
+def _decimals(precision):
+    """Number of decimals for a precision given as digits (int) or as a resolution (float)."""
+    if isinstance(precision, float):
+        return int(precision) if precision >= 0 else int(-np.log10(precision))
+    return precision
+
+
+def _env_number(name):
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+
+@contextlib.contextmanager
+def _text_writer(f, mode="w"):
+    """
+    Yield a function writing strings to f, which may be a path (opened with
+    *mode*), a text handle or a binary stream (written as UTF-8).
+    """
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, mode) as handle:
+            yield handle.write
+    elif isinstance(f, (RawIOBase, BufferedIOBase)) or "b" in str(getattr(f, "mode", "")):
+        yield lambda text: f.write(text.encode("utf-8"))
+    else:
+        yield f.write
+
+
+# Optional last line of a data file giving the byte offset of the metadata block
+_OFFSET_KEY = "Metadata offset"
+_OFFSET_DIGITS = 12
+_TRAILER_LENGTH = len(f"# {_OFFSET_KEY} = ") + _OFFSET_DIGITS + 1
+
+
+def _metadata_offset(file):
+    """
+    Byte offset of the metadata block of a binary file object, from its
+    trailer line, or None if the file has no (valid) trailer.
+    """
+    size = file.seek(0, os.SEEK_END)
+    if size < _TRAILER_LENGTH:
+        return None
+    file.seek(size - _TRAILER_LENGTH)
+    trailer = file.read(_TRAILER_LENGTH)
+    prefix = f"# {_OFFSET_KEY} = ".encode()
+    digits = trailer[len(prefix):-1]
+    if not trailer.startswith(prefix) or not digits.isdigit():
+        return None
+
+    offset = int(digits)
+    if offset >= size - _TRAILER_LENGTH:
+        return None
+    file.seek(offset)
+    if file.read(1) != b"#":
+        return None
+    file.seek(offset)
+    return offset
+
+
+def _parse_metadata_lines(lines):
+    """Metadata from "# key = value" (or "# key: value") comment lines, skipping other lines."""
+    metadata = OrderedDict()
+    for line in lines:
+        line = line.strip()
+        if not line.startswith("#"):
+            continue
+        line = line.replace("#", "").strip()
+        if "=" in line:
+            key, value = line.split("=", 1)
+        elif ":" in line:
+            key, value = line.split(":", 1)
+        else:
+            raise ValueError(f"Unknown separator in metadata line: {line!r}")
+        metadata[key.strip()] = value.strip()
+    metadata.pop(_OFFSET_KEY, None)
+    return metadata
+
+
+def _format_row(row):
+    if isinstance(row, (list, tuple, np.ndarray)):
+        return ",".join(map(str, row)) + "\n"
+    return str(row) + "\n"
+
+
+def _parameter_property(name, field, slot):
+    """Lab attribute stored in *slot* of the lab's parameter object."""
+    validate = field.validate
+    store = slot.__set__
+
+    if field.container:
+        # The value may be changed in place, so stop sharing it first
+        def fget(self):
+            if self.__dict__.get("_params_shared"):
+                self._own_params()
+            return slot.__get__(self._params)
+    else:
+        fget = operator.attrgetter(f"_params.{name}")
+
+    def fset(self, value):
+        value = validate(name, value)
+        state = self.__dict__
+        if state.get("_params_shared"):
+            self._own_params()
+        store(state["_params"], value)
+        # Keep the metadata entry of the same name, if any, up to date
+        metadata = state.get("metadata")
+        if metadata is not None and name in metadata:
+            metadata[name] = value
+
+    return property(fget, fset, doc=f"Lab parameter {name!r} (stored in self.params)")
+
+
 class cek_labs(ABC):
+    # Validated parameters shared by every lab; subclasses add their own in
+    # parameter_fields and get them as attributes backed by self.params
+    parameter_fields = {
+        "student_ID": cek.Field(123456789, numbers.Integral, minimum=0),
+        "sample": cek.Field(None, str, optional=True),
+        "output_file": cek.Field(None, (str, os.PathLike), optional=True),
+        "number_of_values": cek.Field(10, numbers.Integral, minimum=1),
+        "noise_level": cek.Field(1, numbers.Real, minimum=0),
+        "precision": cek.Field(1, numbers.Real),
+        "temperature": cek.Field(298, numbers.Real, minimum=0, positive=True),
+    }
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            fields.update(klass.__dict__.get("parameter_fields", {}))
+        cls.parameter_fields = fields
+
+        # Named after the lab class so that parameter objects can be pickled
+        cls.Parameters = cek.make_parameters(
+            "Parameters", fields, module=cls.__module__, qualname=f"{cls.__qualname__}.Parameters"
+        )
+        for name, field in fields.items():
+            setattr(cls, name, _parameter_property(name, field, cls.Parameters.__dict__[name]))
+
     def __init__(self, **kwargs):
+        self._params = self.Parameters()
         self.token = None
+        # Part of the seed of the datasets derived from a student ID and attempt
+        self.course = "CHEM2000"
         self.student_ID = 123456789
 
         self.noise_level = 1
         self.precision = 1
 
+        # Draw random numbers in the same order as earlier versions, so that
+        # existing sample IDs reproduce the same data
+        self.rng_compatibility = True
+
         self.available_samples = []
         self.sample_parameters = {}
         self.sample = None
@@ -42,9 +204,16 @@ class cek_labs(ABC):
 
         self.number_of_values = 10
         self.output_file = None
-        self.filename_gen = cek.TempFilenameGenerator()
+        self.filename_gen = cek.TempFilenameGenerator(directory=os.environ.get("PYCEK_WORKDIR", "."))
+
+        # Lifetime (s) and per-session disk quota (bytes) of the files written by this lab
+        self.file_max_age = _env_number("PYCEK_FILE_MAX_AGE")
+        self.file_quota = _env_number("PYCEK_FILE_QUOTA")
 
-        self.metadata = OrderedDict(
+        # End data files with the byte offset of their metadata, for fast metadata reads
+        self.metadata_index = False
+
+        self.metadata = cek.Metadata(
             {
                 "student_ID": self.student_ID,
                 "number_of_values": self.number_of_values,
@@ -67,7 +236,60 @@ class cek_labs(ABC):
         self.list_of_data_files = []
 
     def __str__(self):
-        return f"CHEM2000 Lab: {self.__class__.__name__}"
+        return f"{self.course} Lab: {self.__class__.__name__}"
+
+    def __getstate__(self):
+        # A copy of the lab opens its own file session when it writes a file
+        state = self.__dict__.copy()
+        state.pop("session_ID", None)
+        state.pop("_session_finalizer", None)
+        state.pop("_params_shared", None)
+        # The cached x grid is rebuilt on demand
+        state.pop("_grid_cache", None)
+        return state
+
+    @property
+    def params(self):
+        """The validated parameter object of the lab (see parameter_fields)."""
+        # The caller may change it directly, so stop sharing it with clones
+        if self.__dict__.get("_params_shared"):
+            self._own_params()
+        return self._params
+
+    def _own_params(self):
+        """Replace a parameter object shared with clones by a private copy."""
+        self.__dict__["_params"] = self._params.clone()
+        self.__dict__["_params_shared"] = False
+
+    @property
+    def file_manager(self):
+        """The file manager shared by all labs of the process."""
+        return cek.get_file_manager()
+
+    def _open_session(self):
+        """
+        Start a new file session for this lab (done when it writes its first file).
+
+        end_session deletes the files of the session. When the lab is garbage
+        collected they are only deleted if a maximum age or a quota is set
+        (e.g. on the server); otherwise they are left on disk and forgotten.
+        """
+        self.session_ID = next(_session_IDs)
+        manager = cek.get_file_manager()
+        if self.file_max_age is not None or self.file_quota is not None:
+            self._session_finalizer = weakref.finalize(self, manager.end_session, self.session_ID, False)
+        else:
+            self._session_finalizer = weakref.finalize(self, manager.forget_session, self.session_ID)
+        # Files of labs still alive at interpreter exit are left on disk
+        self._session_finalizer.atexit = False
+
+    def _track_file(self, filename):
+        """Hand a file written by this lab under a generated name to the file manager."""
+        if "session_ID" not in self.__dict__:
+            self._open_session()
+        self.file_manager.track(
+            filename, self.session_ID, max_age=self.file_max_age, quota=self.file_quota
+        )
 
     # ------------------------------------------------------------------
     # Identity / configuration
@@ -85,7 +307,7 @@ class cek_labs(ABC):
                 raise ValueError("student_ID must be an integer")
         else:
             raise ValueError("student_ID must be an integer")
-        self.update_metadata_from_attr()
+        self._sync_output_file()
 
     def set_token(self, token):
         self.token = token
@@ -94,13 +316,44 @@ class cek_labs(ABC):
         return self.token != 23745419
 
     def set_parameters(self, **kwargs):
-        """Set one or more lab parameters by name."""
+        """
+        Set one or more lab parameters by name.
+
+        Parameters in parameter_fields update their metadata entry when they
+        are assigned; for any other attribute only its own entry is refreshed.
+        """
         for k, w in kwargs.items():
             if k == "student_ID":
                 self.set_student_ID(w)
             else:
                 setattr(self, k, w)
-        self.update_metadata_from_attr()
+                if k not in self.parameter_fields and k in self.metadata:
+                    self.metadata[k] = w
+        self._sync_output_file()
+
+    def clone(self, **changes):
+        """
+        Return a copy of the lab with some parameters changed, e.g. for another student.
+
+        setup_lab is not run again: the metadata is copied, read-only tables
+        such as sample_parameters are shared, and the copy gets its own file
+        session and filename generator (same directory, root and extension,
+        no files yet). The parameter object is shared too, and copied by whichever
+        of the two labs first changes a parameter (copy on write).
+        """
+        new = object.__new__(type(self))
+        new.__dict__.update(self.__getstate__())
+        new.__dict__.pop("data", None)
+        self.__dict__["_params_shared"] = new.__dict__["_params_shared"] = True
+        new.metadata = self.metadata.copy()
+        new.list_of_data_files = []
+        gen = self.filename_gen
+        new.filename_gen = cek.TempFilenameGenerator(
+            directory=gen.directory, root=gen.root, ext=gen.ext, random_length=gen.random_length
+        )
+        if changes:
+            new.set_parameters(**changes)
+        return new
 
     # ------------------------------------------------------------------
     # Metadata helpers
@@ -110,7 +363,16 @@ class cek_labs(ABC):
         for key, value in kwargs.items():
             self.metadata[key] = value
 
+    def _sync_output_file(self):
+        """
+        Reset the "output_file" entry, which the writers set to the name of the
+        file they wrote, to the output_file parameter.
+        """
+        if "output_file" in self.metadata:
+            self.metadata["output_file"] = self.output_file
+
     def update_metadata_from_attr(self):
+        """Refresh every metadata entry named after an attribute (no longer needed after set_parameters)."""
         for k in self.metadata:
             try:
                 self.metadata[k] = getattr(self, k)
@@ -125,76 +387,201 @@ class cek_labs(ABC):
     # ------------------------------------------------------------------
 
     def write_metadata(self, f=None):
-        """Write metadata to a file (appended) or to the logger."""
+        """
+        Write the metadata block, as comment lines, in a single write.
+
+        Parameters
+        ----------
+        f : str, path, text handle or binary stream, optional
+            A path is opened once in append mode; an open handle is written
+            at its current position. Without f the metadata go to the logger.
+        """
         if f is None:
-            def dump(s):
-                self.logger.info(s)
-        else:
-            def dump(s):
-                with open(f, "a") as file:
-                    file.write(f"# {s}\n")
+            for line in self.metadata.lines():
+                self.logger.info(line)
+            return
+
+        with _text_writer(f, "a") as write:
+            write(self.metadata.block())
+
+    def write_data(self, f, chunk_size=10000, **kwargs):
+        """
+        Stream the column header, self.data and the metadata block to f.
+
+        f may be a path, a text handle or a binary stream (e.g. a gzip file).
+        Rows are formatted and written chunk_size at a time, so the whole
+        file is never held in memory as one string.
 
-        for key, value in self.metadata.items():
-            label = key.replace("_", " ")
-            label = label[0].upper() + label[1:]
-            dump(f"{label} = {value}")
+        With metadata_index, a last "# Metadata offset = ..." line gives the
+        byte offset of the metadata block from the start of what was written.
+        """
+        columns = kwargs.get("columns") or self.metadata.get("columns")
+        with _text_writer(f) as write:
+            written = 0
+            if self.metadata_index:
+                def emit(text):
+                    nonlocal written
+                    written += len(text.encode("utf-8"))
+                    write(text)
+            else:
+                emit = write
+
+            if columns:
+                emit(",".join(columns) + "\n")
+            for start in range(0, len(self.data), chunk_size):
+                emit("".join([_format_row(row) for row in self.data[start:start + chunk_size]]))
+            emit(self.metadata.block())
+
+            if self.metadata_index:
+                offset = written - len(self.metadata.block().encode("utf-8"))
+                write(f"# {_OFFSET_KEY} = {offset:0{_OFFSET_DIGITS}d}\n")
 
     def read_metadata(self, f):
         """
         Read metadata comment lines from a data file.
 
+        Files written with metadata_index end with the offset of their
+        metadata block, which is then read directly without scanning the
+        data; other files are scanned line by line.
+
         Returns
         -------
         metadata : OrderedDict
         """
-        metadata = OrderedDict()
-        with open(f, "r") as file:
-            for line in file:
-                line = line.strip()
-                if not line.startswith("#"):
-                    continue
-                line = line.replace("#", "").strip()
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                elif ":" in line:
-                    key, value = line.split(":", 1)
-                else:
-                    raise ValueError(f"Unknown separator in metadata line: {line!r}")
-                metadata[key.strip()] = value.strip()
-        return metadata
+        with open(f, "rb") as file:
+            if _metadata_offset(file) is None:
+                file.seek(0)
+            return _parse_metadata_lines(line.decode("utf-8") for line in file)
 
     # ------------------------------------------------------------------
     # Data file I/O
     # ------------------------------------------------------------------
 
     def write_data_to_file(self, **kwargs):
-        """Write self.data plus metadata to a file and return the filename."""
-        filename = self.output_file if self.output_file is not None else self.filename_gen.random
+        """
+        Write self.data plus metadata to a file and return the filename.
+
+        The file is output_file if set; it is never deleted by the lab.
+        Otherwise a new file with a generated name is created and handed to
+        the file manager (see end_session).
+        """
+        generated = self.output_file is None
+        if not generated:
+            filename = self.output_file
+            f = open(filename, "w")
+        else:
+            # Created with O_EXCL, concurrent sessions never overwrite each other
+            filename, f = self.filename_gen.create()
         self.add_metadata(output_file=filename)
 
-        with open(filename, "w") as f:
-            f.write(self.write_data_to_string(**kwargs))
+        with f:
+            self.write_data(f, **kwargs)
 
         self.list_of_data_files.append(filename)
+        if generated:
+            self._track_file(filename)
         return filename
 
-    def write_data_to_string(self, **kwargs):
-        """Serialise self.data and metadata to a CSV string."""
-        columns = kwargs.get("columns") or self.metadata.get("columns")
-        string = (",".join(columns) + "\n") if columns else ""
+    def write_data_to_buffer(self, compress=False, **kwargs):
+        """
+        Serialise self.data and metadata to an in-memory buffer.
 
-        for row in self.data:
-            if isinstance(row, (list, tuple, np.ndarray)):
-                string += ",".join(map(str, row)) + "\n"
-            else:
-                string += str(row) + "\n"
+        Nothing is written to disk: the filename is only generated to be
+        recorded in the metadata and offered to the user for the download.
 
-        for key, value in self.metadata.items():
-            label = key.replace("_", " ")
-            label = label[0].upper() + label[1:]
-            string += f"# {label} = {value}\n"
+        Parameters
+        ----------
+        compress : bool
+            If True, gzip the content and append ``.gz`` to the filename.
 
-        return string
+        Returns
+        -------
+        filename : str
+        buffer   : BytesIO
+        """
+        if self.output_file is not None:
+            filename = self.output_file
+        else:
+            filename = os.path.basename(self.filename_gen.random)
+        if compress:
+            filename += ".gz"
+        self.add_metadata(output_file=filename)
+
+        buffer = BytesIO()
+        if compress:
+            # mtime=0 makes the output depend only on the content
+            with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as stream:
+                self.write_data(stream, **kwargs)
+        else:
+            self.write_data(buffer, **kwargs)
+        buffer.seek(0)
+
+        return filename, buffer
+
+    def add_to_archive(self, archive, name=None, **kwargs):
+        """
+        Add self.data and metadata, as CSV, to a DatasetArchive and return the entry name.
+
+        The entry is named after output_file, or gets a new random name, and
+        is compressed in the archive's background thread.
+        """
+        if name is None:
+            name = os.path.basename(self.output_file or self.filename_gen.random)
+        self.add_metadata(output_file=name)
+        archive.add(name, self.write_data_to_string(**kwargs), self.metadata)
+        return name
+
+    def to_arrow(self, metadata_columns=False):
+        """
+        Convert self.data to an Arrow table (requires pyarrow).
+
+        The metadata are stored as schema metadata, or as constant string
+        columns with metadata_columns=True.
+        """
+        return cek.dataset_to_arrow(self.data, self.metadata, metadata_columns=metadata_columns)
+
+    def write_parquet(self, filename=None, compression="zstd", **kwargs):
+        """
+        Write self.data and its metadata to a Parquet file and return the filename.
+
+        Without a filename a new file with a random name ending in .parquet
+        is created (atomically, like write_data_to_file) and tracked like
+        the generated CSV files. The filename is recorded as output_file in
+        the metadata. Extra keyword arguments are passed to
+        pyarrow.parquet.write_table.
+        """
+        generated = filename is None
+        if generated:
+            # Created with O_EXCL, concurrent sessions never overwrite each other
+            filename, target = self.filename_gen.create(mode="wb", ext="parquet")
+        else:
+            target = filename
+        self.add_metadata(output_file=filename)
+
+        try:
+            # Converting first raises a clear error when pyarrow is missing
+            table = self.to_arrow()
+            import pyarrow.parquet
+            pyarrow.parquet.write_table(table, target, compression=compression, **kwargs)
+        except BaseException:
+            if generated:
+                target.close()
+                os.remove(filename)
+            raise
+        finally:
+            if generated:
+                target.close()
+
+        self.list_of_data_files.append(filename)
+        if generated:
+            self._track_file(filename)
+        return filename
+
+    def write_data_to_string(self, **kwargs):
+        """Serialise self.data and metadata to a CSV string."""
+        buffer = StringIO()
+        self.write_data(buffer, **kwargs)
+        return buffer.getvalue()
 
     def read_data_file(self, filename=None):
         """
@@ -227,18 +614,7 @@ class cek_labs(ABC):
         )
         data_array = structured_to_unstructured(data)
 
-        metadata = None
-        if comments:
-            metadata = OrderedDict()
-            for line in comments:
-                line = line.replace("#", "").strip()
-                if "=" in line:
-                    key, value = line.split("=", 1)
-                elif ":" in line:
-                    key, value = line.split(":", 1)
-                else:
-                    raise ValueError(f"Unknown separator in metadata line: {line!r}")
-                metadata[key.strip()] = value.strip()
+        metadata = _parse_metadata_lines(comments) if comments else None
 
         if self.logger.isEnabledFor(10):  # DEBUG level
             self.logger.debug("-" * 50)
@@ -252,35 +628,70 @@ class cek_labs(ABC):
     # Data generation
     # ------------------------------------------------------------------
 
-    def create_data_for_lab(self, sample_ID=None):
+    def create_data_for_lab(self, sample_ID=None, attempt=None):
         """
         Generate a dataset for the lab.
 
-        The RNG is seeded from the current system time (nanoseconds) so every
-        call produces a unique dataset.  The seed is stored as ``sample_ID``
-        in the metadata so the exact dataset can be reproduced later via
-        ``reproduce_data(sample_ID)``.
+        Without arguments the RNG is seeded with a fresh 64-bit ID drawn from
+        operating system entropy, so every call produces a unique dataset,
+        even in many processes at once.  With *attempt*, the ID is derived
+        from (course, student_ID, lab, attempt) instead (see
+        ``derive_sample_ID``), so it is the same wherever it is computed.
+        The seed is stored as ``sample_ID`` in the metadata so the exact
+        dataset can be reproduced later via ``reproduce_data(sample_ID)``.
 
         Parameters
         ----------
         sample_ID : int, optional
             Provide an explicit seed to reproduce a previously generated
-            dataset.  If omitted, a fresh time-based seed is used.
+            dataset.
+        attempt : int, optional
+            Attempt number of the student, used when sample_ID is omitted.
 
         Returns
         -------
         data : object
             Whatever ``create_data`` returns for the concrete subclass.
         """
+        self._seed_rng(sample_ID, attempt)
+        data = self.create_data()
+        return data
+
+    def _seed_rng(self, sample_ID=None, attempt=None):
+        """
+        Seed the RNG for a new dataset and record the seed as ``sample_ID``
+        in the metadata (see ``create_data_for_lab``). Returns the sample ID.
+        """
         if sample_ID is None:
-            # Mask to a valid 32-bit unsigned integer for numpy
-            sample_ID = time.time_ns() & 0xFFFFFFFF
+            if attempt is None:
+                sample_ID = cek.fresh_sample_ID()
+            else:
+                sample_ID = self.derive_sample_ID(attempt)
 
         self.add_metadata(sample_ID=sample_ID)
-        np.random.seed(sample_ID)
+        cek.seed_global_rng(sample_ID)
         self.logger.debug(f"RNG seeded with sample_ID = {sample_ID}")
 
-        data = self.create_data()
+        # The new dataset has not been written to any file yet
+        self._sync_output_file()
+        return sample_ID
+
+    def derive_sample_ID(self, attempt=0):
+        """Sample ID of an attempt of the current student at this lab (see ``derive_sample_ID``)."""
+        return cek.derive_sample_ID(self.course, self.student_ID, type(self).__name__, attempt)
+
+    async def acreate_data_for_lab(self, sample_ID=None, attempt=None):
+        """
+        Asynchronous version of ``create_data_for_lab``.
+
+        The data are generated in the shared process pool (see
+        ``run_in_pool``), so the event loop stays responsive and several
+        sessions can generate data on different cores at the same time.
+        The lab is updated exactly as if ``create_data_for_lab`` had been
+        called directly.
+        """
+        data, state = await cek.run_in_pool(_create_data_in_worker, self, sample_ID, attempt)
+        self.__dict__.update(state)
         return data
 
     def reproduce_data(self, sample_ID):
@@ -289,8 +700,9 @@ class cek_labs(ABC):
 
         Parameters
         ----------
-        sample_ID : int
-            The seed recorded in the data file's metadata (``Sample ID``).
+        sample_ID : int or str
+            The seed recorded in the data file's metadata (``Sample ID``),
+            either a legacy 32-bit seed or a 64-bit ID.
 
         Returns
         -------
@@ -306,6 +718,15 @@ class cek_labs(ABC):
         self.create_data_for_lab()
         return self.write_data_to_file()
 
+    def create_data_buffer(self, compress=False):
+        """
+        Generate data and serialise it in memory, without touching the filesystem.
+
+        Returns ``(filename, BytesIO)``; see ``write_data_to_buffer``.
+        """
+        self.create_data_for_lab()
+        return self.write_data_to_buffer(compress=compress)
+
     def get_data(self):
         return self.data
 
@@ -313,6 +734,12 @@ class cek_labs(ABC):
     # Internal helpers
     # ------------------------------------------------------------------
 
+    def end_session(self, wait=True):
+        """Delete the files with generated names this lab wrote and that are still tracked."""
+        session_ID = self.__dict__.get("session_ID")
+        if session_ID is not None:
+            self.file_manager.end_session(session_ID, wait=wait)
+
     def _cleanup(self, pattern=None):
         """Delete all data files created during this session."""
         for ff in self.list_of_data_files:
@@ -321,35 +748,65 @@ class cek_labs(ABC):
                 fp.unlink()
             else:
                 self.logger.warning(f"File not found during cleanup: {ff}")
+        # Nothing left for the file manager to delete
+        self.end_session()
 
         if pattern is not None:
-            for fp in Path(".").glob(pattern):
+            for fp in Path(self.filename_gen.directory).glob(pattern):
                 fp.unlink()
 
     def _valid_ID(self, ID):
         return ID in ["23745411"]
 
-    def _round_values(self, values, precision=None):
+    def _round_values(self, values, precision=None, out=None):
         if precision is None:
             precision = self.precision
 
-        if isinstance(precision, float):
-            precision = int(precision) if precision >= 0 else int(-np.log10(precision))
-        elif not isinstance(precision, int):
+        if not isinstance(precision, (int, float)):
             raise TypeError(f"precision must be int or float, got {type(precision)}")
 
-        return np.round(values, decimals=precision)
+        return np.round(values, decimals=_decimals(precision), out=out)
+
+    def _linear_grid(self, xrange, n):
+        """Evenly spaced x values, shared read-only until another (xrange, n) is asked for."""
+        key = (tuple(float(v) for v in xrange), n)
+        cached = self.__dict__.get("_grid_cache")
+        if cached is None or cached[0] != key:
+            grid = np.linspace(*xrange, n)
+            grid.flags.writeable = False
+            cached = self.__dict__["_grid_cache"] = (key, grid)
+        return cached[1]
 
     def _generate_uniform_random(self, lower, upper, n):
-        return self._round_values(np.random.uniform(lower, upper, n))
+        values = np.random.uniform(lower, upper, n)
+        return self._round_values(values, out=values)
 
-    def _generate_normal_random(self, n, prm):
-        arrays = []
-        for p in prm:
-            values = np.random.normal(p[0], p[1], size=n)
-            arrays.append(self._round_values(values))
+    def _generate_normal_random(self, n, prm, n_datasets=None):
+        """
+        n values for each (mean, std) pair in prm, one column per pair.
 
-        return arrays[0] if len(arrays) == 1 else np.column_stack(arrays)
+        With n_datasets, that many datasets are drawn at once and the result
+        has shape (n_datasets, n, k), keeping the column axis even for k = 1.
+
+        All columns come from a single draw. With rng_compatibility the
+        numbers are consumed column by column (and dataset by dataset within
+        a column), as when each column was drawn separately, and the result
+        is a view with the column axis moved last.
+        """
+        loc, scale = np.array(prm, dtype=float).reshape(-1, 2).T
+        k = len(loc)
+        shape = (n,) if n_datasets is None else (n_datasets, n)
+        if self.rng_compatibility:
+            expand = (k,) + (1,) * len(shape)
+            values = np.random.normal(loc.reshape(expand), scale.reshape(expand), size=(k,) + shape)
+            values = np.moveaxis(values, 0, -1)
+        else:
+            values = np.random.normal(loc, scale, size=shape + (k,))
+        self._round_values(values, out=values)
+
+        if n_datasets is None and k == 1:
+            return values[:, 0]
+        return values
 
     def _generate_noise(self, n, noise_level=None, ntype="normal"):
         if noise_level is None:
@@ -357,7 +814,10 @@ class cek_labs(ABC):
         if noise_level <= 0:
             return np.zeros(n)
         if ntype == "normal":
-            return np.random.normal(0, noise_level, size=n)
+            # Same stream and values as np.random.normal(0, noise_level, n), scaled in place
+            noise = np.random.standard_normal(n)
+            noise *= noise_level
+            return noise
         raise ValueError(f"Unknown noise type: {ntype!r}")
 
     def _generate_data_from_function(self, func, params, nvalues, xrange):
@@ -413,25 +873,36 @@ class cek_labs(ABC):
             raise ValueError("nvalues must be a positive integer")
 
         if xspacing == "linear":
-            x = np.linspace(*xrange, nvalues)
+            x = self._linear_grid(xrange, nvalues)
         elif xspacing == "random":
-            x = np.sort(self._generate_uniform_random(*xrange, nvalues))
+            x = self._generate_uniform_random(*xrange, nvalues)
+            x.sort()
         else:
             raise ValueError(f"xspacing must be 'linear' or 'random', got {xspacing!r}")
 
-        y = function(x, **params)
+        data = np.empty((nvalues, 2))
+        data[:, 0] = x
+
+        # Post-process y in place; it must not be (a view of) x
+        y = np.asarray(function(x, **params), dtype=float)
+        if y.shape != x.shape:
+            y = np.broadcast_to(y, x.shape).copy()
+        elif np.shares_memory(y, x) or not y.flags.writeable:
+            y = y.copy()
 
         if background is not None:
-            y = y + background
+            y += background
 
         if noise_level is not None:
-            y = y + self._generate_noise(nvalues, noise_level)
+            y += self._generate_noise(nvalues, noise_level)
 
         if positive:
+            # fmax, like max(eps, abs(v)), turns nan into eps
             eps = np.power(10.0, -self.precision)
-            y = np.array([max(eps, abs(v)) for v in y])
+            np.fmax(np.abs(y, out=y), eps, out=y)
 
-        return np.column_stack((x, self._round_values(y)))
+        self._round_values(y, out=data[:, 1])
+        return data
 
     # ------------------------------------------------------------------
     # Abstract interface
@@ -0,0 +1,151 @@
+import numpy as np
+
+
+def _pyarrow():
+    """Import pyarrow, which is an optional dependency."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Arrow/Parquet export requires pyarrow; install it with "
+            "'pip install pyarrow' or 'pip install pycek_public[arrow]'"
+        ) from e
+    return pyarrow
+
+
+def _column_names(data, metadata):
+    ncols = 1 if data.ndim == 1 else data.shape[1]
+    names = list(metadata.get("columns") or [])
+    if len(names) != ncols:
+        names = [f"column_{i}" for i in range(ncols)]
+    return names
+
+
+def _data_arrays(pa, data, names):
+    data = np.asarray(data)
+    if data.ndim == 1:
+        return {names[0]: pa.array(data)}
+    # Columns of a C-ordered array are strided; pyarrow needs them contiguous
+    return {name: pa.array(np.ascontiguousarray(data[:, i])) for i, name in enumerate(names)}
+
+
+def _as_dataset(item):
+    """(data, metadata) from a lab or from a (data, metadata) pair."""
+    if hasattr(item, "data") and hasattr(item, "metadata"):
+        return item.data, item.metadata
+    return item
+
+
+def dataset_to_arrow(data, metadata, metadata_columns=False):
+    """
+    Convert one dataset to an Arrow table with one column per data column.
+
+    Args:
+        data (np.ndarray): Shape (n,) or (n, k) values
+        metadata (dict): Lab metadata; its "columns" entry names the columns
+        metadata_columns (bool): Store the metadata as (dictionary-encoded)
+            string columns instead of as schema metadata (default: False)
+
+    Returns:
+        pyarrow.Table
+    """
+    pa = _pyarrow()
+    data = np.asarray(data)
+    columns = _data_arrays(pa, data, _column_names(data, metadata))
+    entries = {str(k): str(v) for k, v in metadata.items()}
+
+    if metadata_columns:
+        n = len(data)
+        for key, value in entries.items():
+            columns[key] = pa.DictionaryArray.from_arrays(
+                pa.array(np.zeros(n, dtype=np.int32)), pa.array([value])
+            )
+        return pa.table(columns)
+    return pa.table(columns).replace_schema_metadata(entries)
+
+
+def datasets_to_arrow(datasets):
+    """
+    Combine many datasets into one long Arrow table.
+
+    Every row gets a "dataset" column with the position of its dataset in
+    *datasets*, and one dictionary-encoded string column per metadata key
+    (empty where a dataset lacks that key). The data columns are named after
+    the "columns" metadata of the first dataset.
+
+    Args:
+        datasets (iterable): Labs, or (data, metadata) pairs
+
+    Returns:
+        pyarrow.Table
+    """
+    pa = _pyarrow()
+    datasets = [_as_dataset(item) for item in datasets]
+    if not datasets:
+        raise ValueError("No datasets to convert")
+
+    arrays = [np.asarray(data) for data, _ in datasets]
+    names = _column_names(arrays[0], datasets[0][1])
+    columns = _data_arrays(pa, np.concatenate(arrays), names)
+
+    lengths = np.array([len(a) for a in arrays])
+    index = np.repeat(np.arange(len(arrays), dtype=np.int32), lengths)
+    columns["dataset"] = pa.array(index)
+
+    keys = []
+    for _, metadata in datasets:
+        keys.extend(str(k) for k in metadata if str(k) not in keys)
+    for key in keys:
+        # One dictionary entry per dataset, indexed by the dataset column
+        values = [str(metadata.get(key, "")) for _, metadata in datasets]
+        columns[key] = pa.DictionaryArray.from_arrays(pa.array(index), pa.array(values))
+
+    return pa.table(columns)
+
+
+def write_parquet_batch(datasets, path, compression="zstd", **kwargs):
+    """
+    Write many datasets to one Parquet file (see datasets_to_arrow).
+
+    Extra keyword arguments are passed to pyarrow.parquet.write_table.
+    """
+    pa = _pyarrow()
+    pa.parquet.write_table(datasets_to_arrow(datasets), path, compression=compression, **kwargs)
+    return path
+
+
+def read_parquet(path, columns=None):
+    """
+    Read a Parquet file written by write_parquet or write_parquet_batch.
+
+    Numeric columns are returned as NumPy arrays that share memory with the
+    Arrow buffers (no copy); other columns (e.g. metadata strings) are
+    converted.
+
+    Args:
+        path (str): Parquet file
+        columns (list): Columns to read (default: all)
+
+    Returns:
+        data (dict): NumPy array by column name
+        metadata (dict): Schema metadata (the lab metadata of a single dataset)
+    """
+    pa = _pyarrow()
+    table = pa.parquet.read_table(path, columns=columns)
+
+    data = {}
+    for name, column in zip(table.column_names, table.columns):
+        array = column.combine_chunks() if column.num_chunks != 1 else column.chunk(0)
+        if pa.types.is_dictionary(array.type):
+            # Metadata columns: convert the few distinct values, then index them
+            values = array.dictionary.to_numpy(zero_copy_only=False)
+            data[name] = values[array.indices.to_numpy(zero_copy_only=False)]
+        elif (pa.types.is_integer(array.type) or pa.types.is_floating(array.type)) and array.null_count == 0:
+            data[name] = array.to_numpy(zero_copy_only=True)
+        else:
+            data[name] = array.to_numpy(zero_copy_only=False)
+
+    raw = table.schema.metadata or {}
+    metadata = {k.decode(): v.decode() for k, v in raw.items() if not k.startswith(b"ARROW:")}
+    return data, metadata
@@ -1,7 +1,21 @@
+import numbers
+
 import pycek_public as cek
 import numpy as np
 
 class crystal_violet(cek.cek_labs):
+    parameter_fields = {
+        "expt_time": cek.Field(1000, numbers.Real, minimum=0, positive=True),
+        "background": cek.Field(0.01, numbers.Real, optional=True),
+        "activation_energy": cek.Field(63e3, numbers.Real),
+        "prefactor": cek.Field(5.9e9, numbers.Real, minimum=0, positive=True),
+        "alpha": cek.Field(1.0, numbers.Real),
+        "beta": cek.Field(0.75, numbers.Real),
+        "conc_to_abs": cek.Field(160e3, numbers.Real, minimum=0, positive=True),
+        "stock_solutions": cek.Field({"cv": 2.5e-5, "oh": 0.5}, dict),
+        "volumes": cek.Field({"cv": 10, "oh": 10, "h2o": 10.0}, dict),
+    }
+
     def setup_lab(self):
         """
         Define base information for the lab.
@@ -0,0 +1,445 @@
+import numpy as np
+
+LN10 = np.log(10.0)
+
+
+def log10_quotient(conc, stoichiometry):
+    """
+    Base-10 logarithm of the reaction quotient, log10(Q) = sum(nu * log10(c)).
+
+    Works on a single composition (shape ``(nspecies,)``) or on any stack of
+    them (shape ``(..., nspecies)``). A zero concentration gives -inf or +inf
+    depending on the sign of its coefficient.
+    """
+    conc = np.asarray(conc, dtype=float)
+    nu = np.asarray(stoichiometry, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = nu * np.log10(conc)
+    # Species not taking part in the reaction must not turn 0 * -inf into nan
+    terms = np.where(nu != 0, terms, 0.0)
+    return terms.sum(axis=-1)
+
+
+def compute_force(conc, stoichiometry, K):
+    """
+    Driving force of the reaction, log10(K) - log10(Q).
+
+    Positive values mean the reaction proceeds forward. This is the same
+    quantity as ``-log10(Q) - pK`` used by the equilibrium notebooks.
+    """
+    return np.log10(K) - log10_quotient(conc, stoichiometry)
+
+
+def _extent_bounds(c0, nu):
+    """Range of reaction extents keeping every concentration non-negative."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        limit = np.where(nu != 0, -c0 / np.where(nu != 0, nu, 1.0), 0.0)
+    lower = np.max(np.where(nu > 0, limit, -np.inf), axis=-1)
+    upper = np.min(np.where(nu < 0, limit, np.inf), axis=-1)
+    return lower, upper
+
+
+def _setup(c0, nu, lnK):
+    """
+    Express the composition of systems of shape (m, nspecies) relative to a bound of the extent.
+
+    Close to a bound the concentration of the limiting species is the small
+    difference between the extent and the bound, which loses its digits when
+    it is computed from the extent. Instead the unknown is u = ln(d), with d
+    the distance of the extent from the bound nearest to the root, and
+    c = c_ref + s * nu * d, where c_ref (the concentrations at the bound) is
+    exactly zero for the limiting species and s is +1 from the lower bound,
+    -1 from the upper one. The root is then always within half the range of
+    the extent from that bound.
+
+    Returns the sign s, the bound, c_ref, the starting u, the bracket
+    (lo, hi) of u, the mask of the systems with a positive solution and the
+    mask of those starting from their initial composition (xi = 0).
+    """
+    lower, upper = _extent_bounds(c0, nu)
+    has_lower = np.isfinite(lower)
+    has_upper = np.isfinite(upper)
+    both = has_lower & has_upper
+    feasible = (lower < upper) & (has_lower | has_upper)
+
+    # The sign of the residual halfway between the bounds tells which bound is nearer to the root
+    mid = np.where(both & feasible, 0.5 * (lower + upper), 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(nu != 0, nu * np.log(c0 + nu * mid[:, None]), 0.0).sum(axis=-1)
+    from_lower = np.where(both, terms > lnK, has_lower)
+    s = np.where(from_lower, 1.0, -1.0)
+    ref = np.where(feasible, np.where(from_lower, lower, upper), 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        limit = np.where(nu != 0, -c0 / np.where(nu != 0, nu, 1.0), 0.0)
+    limiting = (s[:, None] * nu > 0) & (limit == ref[:, None])
+    c_ref = np.where(limiting, 0.0, np.maximum(c0 + nu * ref[:, None], 0.0))
+
+    d_max = np.where(both, 0.5 * (upper - lower), np.inf)
+    d_c0 = -s * ref
+    at_c0 = np.all((c0 > 0) | (nu == 0), axis=-1) & (d_c0 > 0) & (d_c0 < d_max)
+    scale = np.maximum(c0.max(axis=-1), 1e-12)
+    d = np.where(at_c0, d_c0, np.where(both, d_max, scale))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        u = np.where(feasible, np.log(d), 0.0)
+        hi = np.log(d_max)
+    lo = np.full_like(u, -np.inf)
+    return s, ref, c_ref, u, lo, hi, feasible, at_c0
+
+
+def _newton_step(u, c_ref, nu, s, lnK, lo, hi):
+    """
+    One safeguarded Newton step on g(u) = s * (sum(nu * ln c) - ln K), see _setup.
+
+    g is monotonically increasing in u, so the root is bracketed by the
+    points where g changes sign. Steps leaving the bracket are replaced by a
+    bisection (or, while one side is unbounded, by a step of at least a
+    factor e in d).
+
+    Returns the new u, the updated bracket, and the concentrations and the
+    force at *u*.
+    """
+    d = np.exp(u)
+    conc = c_ref + s[:, None] * nu * d[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        f = np.where(nu != 0, nu * np.log(conc), 0.0).sum(axis=-1) - lnK
+        g = s * f
+        gprime = d * np.where(nu != 0, nu * nu / conc, 0.0).sum(axis=-1)
+
+    lo = np.where(g < 0, u, lo)
+    hi = np.where(g > 0, u, hi)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        candidate = u - g / gprime
+
+    inside = (candidate > lo) & (candidate < hi) & np.isfinite(candidate)
+    with np.errstate(invalid="ignore"):
+        fallback = np.where(
+            np.isfinite(lo) & np.isfinite(hi),
+            0.5 * (lo + hi),
+            np.where(np.isfinite(hi), u - np.maximum(2.0 * (hi - u), 1.0), u + np.maximum(2.0 * (u - lo), 1.0)),
+        )
+    new_u = np.where(inside, candidate, fallback)
+    return new_u, lo, hi, conc, -f / LN10
+
+
+class IterationTrace:
+    """
+    Fixed-size record of the history of an iterative solver.
+
+    The first iterations are all kept, later ones on a logarithmic grid up
+    to *max_iterations*, and the most recent iteration is always available,
+    so memory use and plotting cost are bounded by *size* however many
+    iterations are run. Each record is a row of *width* floats; the
+    iteration numbers are stored alongside to be used as the x axis.
+
+    Example::
+
+        trace = IterationTrace(max_iterations, width=nspecies + 1)
+        for i in range(max_iterations + 1):
+            ...
+            trace.record(i, np.append(conc, force))
+        iterations, history = trace.arrays()
+    """
+    def __init__(self, max_iterations, width, size=256):
+        max_iterations = max(int(max_iterations), 1)
+        self.targets = np.unique(np.concatenate([
+            [0],
+            np.round(np.geomspace(1, max_iterations, max(size - 1, 1))).astype(np.int64),
+        ]))
+        self.iterations = np.empty(len(self.targets), dtype=np.int64)
+        self.data = np.empty((len(self.targets), width))
+        self.count = 0
+        self.last_iteration = None
+        self.last = np.empty(width)
+
+    def record(self, iteration, values):
+        """Record *values* (shape (width,)) for *iteration*; iterations must increase."""
+        if self.count < len(self.targets) and iteration >= self.targets[self.count]:
+            self.iterations[self.count] = iteration
+            self.data[self.count] = values
+            self.count += 1
+        self.last_iteration = iteration
+        self.last[:] = values
+
+    def arrays(self):
+        """Return (iterations, data) for the kept records, the last iteration included."""
+        iterations = self.iterations[:self.count]
+        data = self.data[:self.count]
+        if self.last_iteration is not None and (self.count == 0 or iterations[-1] != self.last_iteration):
+            iterations = np.append(iterations, self.last_iteration)
+            data = np.vstack([data, self.last])
+        return iterations, data
+
+
+def solve_equilibrium(initial_conc, stoichiometry, K, tol=1e-8, max_iterations=100, trace_size=256):
+    """
+    Solve a single-reaction equilibrium with a damped (safeguarded) Newton method.
+
+    The equation solved is the logarithmic form sum(nu * ln c) = ln K, with
+    c = c0 + nu * xi for the extent of reaction xi. The unknown is the log of
+    the distance of xi from the bound nearer to the root (the limiting
+    concentration, up to its coefficient), so even a limiting species at
+    1e-30 of the others is obtained to full precision. Each step costs a few
+    vectorised NumPy operations over the species, and the method typically
+    converges in a handful of iterations rather than the thousands needed by
+    a fixed concentration step.
+
+    Parameters
+    ----------
+    initial_conc : array_like
+        Initial concentrations of the species.
+    stoichiometry : array_like
+        Stoichiometric coefficients (negative for reactants).
+    K : float
+        Equilibrium constant.
+    tol : float
+        Convergence threshold on the force, |log10(K) - log10(Q)|.
+    max_iterations : int
+        Maximum number of Newton steps.
+    trace_size : int
+        Maximum number of iterations kept in the returned history, see
+        ``IterationTrace``.
+
+    Returns
+    -------
+    conc       : np.ndarray
+        Shape (nrecords, nspecies) concentrations at the recorded iterations;
+        the last row is the final composition.
+    forces     : np.ndarray
+        Shape (nrecords, 1) force at the recorded iterations.
+    deltas     : np.ndarray
+        Shape (nrecords, 1) change in the extent of reaction made to reach
+        each recorded iteration (zero for the initial point).
+    iterations : np.ndarray
+        Shape (nrecords,) iteration numbers of the records.
+    """
+    c0 = np.asarray(initial_conc, dtype=float)
+    nu = np.asarray(stoichiometry, dtype=float)
+    if c0.shape != nu.shape or c0.ndim != 1:
+        raise ValueError("initial_conc and stoichiometry must be 1D arrays of the same length")
+
+    if not np.any(nu != 0):
+        raise ValueError("stoichiometry must have a nonzero coefficient")
+
+    lnK = np.log(np.atleast_1d(np.asarray(K, dtype=float)))
+    s, ref, c_ref, u, lo, hi, feasible, at_c0 = _setup(c0[None, :], nu, lnK)
+    if not feasible[0]:
+        raise ValueError("No equilibrium with all concentrations positive exists for these initial conditions")
+
+    ns = len(c0)
+    trace = IterationTrace(max_iterations + 1, ns + 2, size=trace_size)
+    count = 0
+    delta = 0.0
+    if not at_c0[0]:
+        # Some species start at zero, or the root is nearer the other bound:
+        # record the initial state, then jump to the starting point
+        trace.record(count, np.concatenate([c0, [compute_force(c0, nu, K), 0.0]]))
+        count += 1
+        delta = ref[0] + s[0] * np.exp(u[0])
+
+    for iteration in range(max_iterations + 1):
+        new_u, lo, hi, conc, force = _newton_step(u, c_ref, nu, s, lnK, lo, hi)
+        trace.record(count, np.concatenate([conc[0], [force[0], delta]]))
+        count += 1
+        if np.abs(force[0]) < tol or iteration == max_iterations:
+            break
+        delta = s[0] * (np.exp(new_u[0]) - np.exp(u[0]))
+        u = new_u
+
+    iterations, history = trace.arrays()
+    return history[:, :ns], history[:, ns:ns + 1], history[:, ns + 1:], iterations
+
+
+def solve_equilibrium_batch(initial_conc, stoichiometry, K, tol=1e-8, max_iterations=100):
+    """
+    Solve many single-reaction equilibria at once.
+
+    *initial_conc* (shape ``(..., nspecies)``) and *K* (shape ``(...)``) are
+    broadcast against each other, so a grid of systems is set up with
+    ordinary NumPy broadcasting, e.g.::
+
+        c0 = np.zeros((len(cA), len(Ks), 2))
+        c0[..., 0] = cA[:, None]
+        c0[..., 1] = 0.1
+        conc, converged = solve_equilibrium_batch(c0, [-1, 1], Ks[None, :])
+
+    All the systems are advanced together by the same Newton iteration as
+    ``solve_equilibrium``, only the ones that have not converged yet being
+    updated, without any Python loop over the systems.
+
+    Returns
+    -------
+    conc      : np.ndarray
+        Shape (..., nspecies) equilibrium concentrations; nan for systems
+        without a positive solution.
+    converged : np.ndarray
+        Shape (...) boolean mask of the systems that reached *tol*.
+    """
+    nu = np.asarray(stoichiometry, dtype=float)
+    c0 = np.asarray(initial_conc, dtype=float)
+    lnK = np.log(np.asarray(K, dtype=float))
+
+    shape = np.broadcast_shapes(c0.shape[:-1], lnK.shape)
+    ns = nu.shape[0]
+    c0 = np.broadcast_to(c0, shape + (ns,)).reshape(-1, ns)
+    lnK = np.broadcast_to(lnK, shape).reshape(-1)
+
+    s, _, c_ref, u, lo, hi, feasible, _ = _setup(c0, nu, lnK)
+    feasible &= np.any(nu != 0)
+
+    converged = np.zeros(len(lnK), dtype=bool)
+    active = np.flatnonzero(feasible)
+    for _ in range(max_iterations + 1):
+        if active.size == 0:
+            break
+        new_u, new_lo, new_hi, _, force = _newton_step(
+            u[active], c_ref[active], nu, s[active], lnK[active], lo[active], hi[active]
+        )
+        done = np.abs(force) < tol
+        converged[active[done]] = True
+
+        todo = ~done
+        active = active[todo]
+        u[active] = new_u[todo]
+        lo[active] = new_lo[todo]
+        hi[active] = new_hi[todo]
+
+    conc = c_ref + s[:, None] * nu * np.exp(u)[:, None]
+    conc[~feasible] = np.nan
+    return conc.reshape(shape + (ns,)), converged.reshape(shape)
+
+
+def _network_residual(N, c, lnK, participates):
+    """N ln c - ln K, ignoring species that take part in no reaction."""
+    return N @ np.log(np.where(participates, c, 1.0)) - lnK
+
+
+def _network_start(N, c0, participates):
+    """
+    Extents giving strictly positive concentrations for every reacting species.
+
+    With everything present initially, xi = 0 will do. Otherwise the linear
+    program max t subject to c0 + N^T xi >= t is solved, with t capped to a
+    small fraction of the initial concentrations so the start stays close to c0.
+    """
+    nr = N.shape[0]
+    if np.all(c0[participates] > 0):
+        return np.zeros(nr)
+
+    from scipy.optimize import linprog
+
+    dense = N.toarray() if hasattr(N, "toarray") else N
+    A = np.hstack([-dense.T[participates], np.ones((participates.sum(), 1))])
+    bound = max(c0.sum(), 1e-12)
+    result = linprog(
+        np.r_[np.zeros(nr), -1.0],
+        A_ub=A,
+        b_ub=c0[participates],
+        bounds=[(-bound, bound)] * nr + [(None, 1e-3 * bound)],
+        method="highs",
+    )
+    if not result.success or result.x[-1] <= 0:
+        raise ValueError(
+            "Cannot find a starting point with all concentrations positive: "
+            "some species can be neither present initially nor produced"
+        )
+    return result.x[:nr]
+
+
+def solve_reaction_network(initial_conc, stoichiometry, K, tol=1e-8, max_iterations=100):
+    """
+    Solve the equilibrium of several coupled reactions.
+
+    The unknowns are the extents of the reactions, xi, with
+    c = c0 + N^T xi, so every conservation law implied by the reactions
+    (e.g. the total amount of a metal or of a proton donor) is satisfied
+    by construction. The equations sum_i N_ji ln c_i = ln K_j are solved
+    with a Newton method whose Jacobian, N diag(1/c) N^T, only has nonzeros
+    where two reactions share a species. Steps are damped so that no
+    concentration becomes negative and the residual decreases.
+
+    Parameters
+    ----------
+    initial_conc : array_like
+        Shape (nspecies,) initial concentrations.
+    stoichiometry : array_like or scipy.sparse matrix
+        Shape (nreactions, nspecies) stoichiometric matrix, one row per
+        reaction, negative coefficients for the reactants. The reactions
+        must be linearly independent. A sparse matrix is kept sparse and the
+        Newton steps are then solved with scipy.sparse.linalg.spsolve.
+    K : array_like
+        Shape (nreactions,) equilibrium constants.
+    tol : float
+        Convergence threshold on the largest force, |log10(K_j) - log10(Q_j)|.
+    max_iterations : int
+        Maximum number of Newton steps.
+
+    Returns
+    -------
+    conc      : np.ndarray
+        Shape (nspecies,) equilibrium concentrations.
+    extent    : np.ndarray
+        Shape (nreactions,) extents of reaction.
+    converged : bool
+        Whether *tol* was reached.
+    """
+    N = stoichiometry
+    sparse = hasattr(N, "tocsr")
+    if sparse:
+        from scipy.sparse import diags
+        from scipy.sparse.linalg import spsolve
+        N = N.tocsr().astype(float)
+        participates = np.asarray(abs(N).sum(axis=0)).ravel() > 0
+    else:
+        N = np.atleast_2d(np.asarray(N, dtype=float))
+        participates = np.any(N != 0, axis=0)
+
+    c0 = np.asarray(initial_conc, dtype=float)
+    lnK = np.log(np.atleast_1d(np.asarray(K, dtype=float)))
+    if N.shape != (lnK.shape[0], c0.shape[0]):
+        raise ValueError("stoichiometry must have shape (len(K), len(initial_conc))")
+
+    xi = _network_start(N, c0, participates)
+    c = c0 + N.T @ xi
+    r = _network_residual(N, c, lnK, participates)
+
+    converged = False
+    for _ in range(max_iterations):
+        if np.max(np.abs(r)) / LN10 < tol:
+            converged = True
+            break
+
+        inv_c = np.where(participates, 1.0 / np.where(participates, c, 1.0), 0.0)
+        if sparse:
+            J = (N @ diags(inv_c) @ N.T).tocsc()
+            step = spsolve(J, -r)
+        else:
+            J = (N * inv_c) @ N.T
+            step = np.linalg.solve(J, -r)
+        if not np.all(np.isfinite(step)):
+            raise ValueError("Singular Jacobian: the reactions must be linearly independent")
+
+        # Largest step keeping every concentration positive, then backtrack
+        dc = N.T @ step
+        shrinking = dc < 0
+        alpha = 1.0
+        if np.any(shrinking):
+            alpha = min(1.0, 0.99 * np.min(c[shrinking] / -dc[shrinking]))
+
+        norm = np.linalg.norm(r)
+        for _ in range(30):
+            c_new = c + alpha * dc
+            r_new = _network_residual(N, c_new, lnK, participates)
+            if np.linalg.norm(r_new) < norm:
+                break
+            alpha *= 0.5
+
+        xi = xi + alpha * step
+        c = c0 + N.T @ xi
+        r = _network_residual(N, c, lnK, participates)
+    else:
+        converged = np.max(np.abs(r)) / LN10 < tol
+
+    return c, xi, bool(converged)
@@ -0,0 +1,75 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _context():
+    """
+    Start method of the pool workers.
+
+    "forkserver" where available: numpy and the lab base class are imported
+    once by the fork server and every worker is forked from it, instead of
+    each worker importing them again as with "spawn". Both are safe in
+    processes that already run threads (the web server, the file reaper).
+    Workers still import the __main__ module, as __mp_main__, so scripts must
+    keep their expensive setup under ``if __name__ == "__main__":``.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["numpy", "pycek_public.cek_labs"])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def get_pool():
+    """
+    Return the process pool shared by every lab and fitter in this process.
+
+    The pool is created on first use. Its size is taken from the
+    PYCEK_POOL_WORKERS environment variable, and defaults to the number of
+    CPUs; deployment/start.sh divides the CPUs among its server processes.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            max_workers = int(os.environ.get("PYCEK_POOL_WORKERS", 0)) or None
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=_context(),
+            )
+        return _pool
+
+
+def shutdown_pool(wait=True):
+    """Shut down the shared pool; a new one is created on the next call to get_pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+
+
+async def run_in_pool(func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) in the shared process pool without blocking the event loop.
+
+    func and its arguments must be picklable. If a worker died, the broken
+    pool is discarded so the next call starts a fresh one.
+    """
+    global _pool
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    try:
+        return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        raise
@@ -0,0 +1,248 @@
+import os
+import queue
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+
+def _reaper_loop(pending, manager_ref, batch_size, sweep_interval):
+    """Delete queued files in batches, sweeping for expired files while idle."""
+    while True:
+        try:
+            path = pending.get(timeout=sweep_interval)
+        except queue.Empty:
+            manager = manager_ref()
+            if manager is None:
+                return
+            manager.expire()
+            del manager
+            continue
+
+        batch = [path]
+        while len(batch) < batch_size:
+            try:
+                batch.append(pending.get_nowait())
+            except queue.Empty:
+                break
+
+        stop = False
+        for path in batch:
+            if path is None:
+                stop = True
+            else:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    # Already gone, or not ours to delete; never kill the thread
+                    pass
+            pending.task_done()
+
+        if stop:
+            return
+
+
+class _Session:
+    """Files of one session: path -> (creation time, size), oldest first."""
+    __slots__ = ("files", "used", "max_age", "quota")
+
+    def __init__(self, max_age=None, quota=None):
+        self.files = OrderedDict()
+        self.used = 0
+        self.max_age = max_age
+        self.quota = quota
+
+
+class FileLifecycleManager:
+    """
+    Keeps track of the data files written by each session and deletes them
+    when they get too old, when their session's quota is exceeded or when
+    their session ends.
+
+    A session is any hashable key, e.g. one per lab. A single manager is
+    shared by the whole process (see get_file_manager), so all deletions are
+    queued to one background thread, which is only started once the first
+    file is tracked and which also sweeps for expired files while idle.
+    Sessions only take memory while they have files on disk.
+    """
+    def __init__(self, batch_size=100, sweep_interval=60.0):
+        """
+        Initialize the manager.
+
+        Args:
+            batch_size (int): Maximum number of files deleted in one go (default: 100)
+            sweep_interval (float): Seconds between checks for expired files (default: 60)
+
+        Example:
+            manager = get_file_manager()
+            manager.track("data.j4k3h2l5m9n8.csv", session=42, max_age=3600, quota=50_000_000)
+            ...
+            manager.end_session(42)
+        """
+        self.batch_size = batch_size
+        self.sweep_interval = sweep_interval
+
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._pending = queue.Queue()
+        self._thread = None
+
+    @property
+    def sessions(self):
+        """Sessions that currently have files on disk."""
+        with self._lock:
+            return list(self._sessions)
+
+    def files(self, session=None):
+        """Files currently tracked for a session, oldest first."""
+        with self._lock:
+            entry = self._sessions.get(session)
+            return [] if entry is None else list(entry.files)
+
+    def used(self, session=None):
+        """Number of bytes currently tracked for a session."""
+        entry = self._sessions.get(session)
+        return 0 if entry is None else entry.used
+
+    def track(self, path, session=None, max_age=None, quota=None):
+        """
+        Start tracking a newly written file.
+
+        Once tracked, the file may be deleted as soon as the session's quota
+        is exceeded or it becomes older than max_age.
+
+        Args:
+            path (str): The file
+            session (hashable): The session that wrote it (default: None)
+            max_age (float): Age in seconds after which the session's files are deleted (default: never)
+            quota (int): Maximum number of bytes kept on disk by the session (default: unlimited)
+        """
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+
+        with self._lock:
+            entry = self._sessions.get(session)
+            if entry is None:
+                entry = self._sessions[session] = _Session()
+            entry.max_age = max_age
+            entry.quota = quota
+
+            if path in entry.files:
+                entry.used -= entry.files.pop(path)[1]
+            entry.files[path] = (time.time(), size)
+            entry.used += size
+
+            # Keep the newest file even if on its own it exceeds the quota
+            if quota is not None:
+                while entry.used > quota and len(entry.files) > 1:
+                    self._schedule(entry, entry.files.popitem(last=False))
+
+            if max_age is not None:
+                self._expire(entry, time.time() - max_age)
+                if not entry.files:
+                    del self._sessions[session]
+                # The background thread also sweeps while the session is idle
+                self._ensure_thread()
+
+    def forget(self, path, session=None):
+        """Stop tracking a file without deleting it."""
+        with self._lock:
+            entry = self._sessions.get(session)
+            if entry is not None and path in entry.files:
+                entry.used -= entry.files.pop(path)[1]
+                if not entry.files:
+                    del self._sessions[session]
+
+    def forget_session(self, session=None):
+        """Stop tracking every file of a session without deleting them."""
+        with self._lock:
+            self._sessions.pop(session, None)
+
+    def expire(self, max_age=None):
+        """
+        Schedule the deletion of every file older than its session's max_age.
+
+        Args:
+            max_age (float): Use this age (s) for every session instead (default: None)
+        """
+        now = time.time()
+        with self._lock:
+            for session, entry in list(self._sessions.items()):
+                age = entry.max_age if max_age is None else max_age
+                if age is not None:
+                    self._expire(entry, now - age)
+                if not entry.files:
+                    del self._sessions[session]
+
+    def end_session(self, session=None, wait=True):
+        """
+        Schedule the deletion of every file tracked for a session.
+
+        Args:
+            session (hashable): The session (default: None)
+            wait (bool): Block until the background thread has deleted them (default: True)
+        """
+        with self._lock:
+            entry = self._sessions.pop(session, None)
+            if entry is not None:
+                while entry.files:
+                    self._schedule(entry, entry.files.popitem(last=False))
+        if wait:
+            self.flush()
+
+    def flush(self):
+        """Block until all scheduled deletions have been carried out."""
+        if self._thread is not None:
+            self._pending.join()
+
+    def close(self):
+        """End every session and stop the background thread."""
+        for session in self.sessions:
+            self.end_session(session, wait=False)
+        self.flush()
+        if self._thread is not None and self._thread.is_alive():
+            self._pending.put(None)
+            self._thread.join()
+        self._thread = None
+
+    def _expire(self, entry, cutoff):
+        """Schedule the files of a session created before cutoff. Called with the lock held."""
+        while entry.files:
+            created, _ = next(iter(entry.files.values()))
+            if created > cutoff:
+                break
+            self._schedule(entry, entry.files.popitem(last=False))
+
+    def _schedule(self, entry, item):
+        """Queue a (path, (created, size)) entry of a session for deletion. Called with the lock held."""
+        path, (_, size) = item
+        entry.used -= size
+        self._pending.put(path)
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        """Start the background thread if it is not running. Called with the lock held."""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=_reaper_loop,
+                args=(self._pending, weakref.ref(self), self.batch_size, self.sweep_interval),
+                name="pycek-file-reaper",
+                daemon=True,
+            )
+            self._thread.start()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_file_manager():
+    """The FileLifecycleManager shared by every lab of the process."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = FileLifecycleManager()
+    return _manager
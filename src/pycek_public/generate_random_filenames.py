@@ -1,8 +1,44 @@
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
 import secrets
 import string
 
+_ALPHABET = string.ascii_letters + string.digits
+# Largest multiple of 62 below 256: bytes under it map uniformly onto the alphabet
+_BYTE_LIMIT = 256 - 256 % len(_ALPHABET)
+
+
+def _copy_file(src, dest):
+    """
+    Copy a single file in-process and return the destination path.
+
+    os.copy_file_range lets the kernel copy (or reflink, on filesystems that
+    support it) without moving the data through user space; shutil.copyfile
+    is used where it is not available or the filesystem refuses it.
+    """
+    if os.path.isdir(dest):
+        dest = os.path.join(dest, os.path.basename(src))
+
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            if remaining == 0:
+                return dest
+        except OSError:
+            pass
+
+    shutil.copyfile(src, dest)
+    return dest
+
+
 class TempFilenameGenerator:
     """
     Generates temporary filenames with .pdb extension and increasing indices.
@@ -31,32 +67,46 @@ class TempFilenameGenerator:
         self.root = root
         self.ext = ext
         self.random_length = random_length
-        self._current_index = self._find_max_index()
+        # The directory is only scanned the first time a sequential name is needed
+        self._current_index = None
         self._current_filename = None
+        # Files actually created by create(), not every name handed out
+        self.generated_files = []
 
     def _find_max_index(self):
         """Find the highest existing index in the directory."""
-        pattern = os.path.join(self.directory, f"{self.root}.*.{self.ext}")
-        existing_files = glob(pattern)
-        
-        if not existing_files:
-            return -1
-            
-        indices = []
-        for filename in existing_files:
-            try:
+        prefix = f"{self.root}."
+        suffix = f".{self.ext}"
+
+        max_index = -1
+        try:
+            entries = os.scandir(self.directory)
+        except FileNotFoundError:
+            return max_index
+
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if not (name.startswith(prefix) and name.endswith(suffix)):
+                    continue
                 # Extract index from tmp.{index}.pdb
-                index = int(os.path.basename(filename).split('.')[-2])
-                indices.append(index)
-            except (ValueError, IndexError):
-                continue
-                
-        return max(indices) if indices else -1
+                index = name[len(prefix):len(name) - len(suffix)]
+                if index.isdigit():
+                    max_index = max(max_index, int(index))
+
+        return max_index
 
     def _generate_random_string(self):
-        """Generate a cryptographically secure random string."""
-        alphabet = string.ascii_letters + string.digits
-        return ''.join(secrets.choice(alphabet) for _ in range(self.random_length))
+        """Generate a cryptographically secure random string (about 5.95 bits per character)."""
+        chars = []
+        while len(chars) < self.random_length:
+            # One call for the whole name; about 3% of the bytes are rejected
+            chars.extend(
+                _ALPHABET[b % len(_ALPHABET)]
+                for b in secrets.token_bytes(self.random_length + 4)
+                if b < _BYTE_LIMIT
+            )
+        return "".join(chars[:self.random_length])
 
     def delete_files(self):
         """Delete all temporary files in the directory."""
@@ -64,16 +114,69 @@ class TempFilenameGenerator:
         for filename in glob(pattern):
             os.remove(filename)
         self._current_index = -1
-            
+
+    def create(self, sequential=False, mode="w", max_attempts=100, ext=None):
+        """
+        Atomically create a new file and return its name with an open handle.
+
+        The file is opened with O_CREAT | O_EXCL, so an existing file is never
+        overwritten; on a name collision (e.g. another session writing to the
+        same directory) a new name is generated.
+
+        Args:
+            sequential (bool): Use sequential names instead of random ones (default: False)
+            mode (str): Mode of the returned file object (default: w)
+            max_attempts (int): Number of names to try before giving up (default: 100)
+            ext (str): Extension of this file instead of self.ext (default: None)
+
+        Returns:
+            tuple: (filename, file object)
+        """
+        flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+        for _ in range(max_attempts):
+            filename = self.next if sequential else self.random
+            if ext is not None:
+                filename = self._current_filename = f"{os.path.splitext(filename)[0]}.{ext}"
+            try:
+                fd = os.open(filename, flags, 0o644)
+            except FileExistsError:
+                if sequential:
+                    # Another process took this index, rescan the directory
+                    self._current_index = self._find_max_index()
+                continue
+            self.generated_files.append(filename)
+            return filename, os.fdopen(fd, mode)
+        raise FileExistsError(f"Unable to create a unique file after {max_attempts} attempts")
+
     def copy_last(self, dest):
         """Copy the last generated file to a destination."""
         if self._current_filename is None:
             raise ValueError("No files have been generated yet")
-        os.system(f"cp {self._current_filename} {dest}")
-        
+        return _copy_file(self._current_filename, dest)
+
+    def copy_all(self, dest_dir, max_workers=8):
+        """
+        Copy every file created by this instance (see create) into a directory.
+
+        Files that have been deleted in the meantime are skipped.
+
+        Args:
+            dest_dir (str): Destination directory, created if missing
+            max_workers (int): Number of files copied concurrently (default: 8)
+
+        Returns:
+            list: Paths of the copied files
+        """
+        os.makedirs(dest_dir, exist_ok=True)
+        sources = [f for f in dict.fromkeys(self.generated_files) if os.path.isfile(f)]
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda f: _copy_file(f, dest_dir), sources))
+
     @property
     def next(self):
         """Generate the next filename in sequence."""
+        if self._current_index is None:
+            self._current_index = self._find_max_index()
         self._current_index += 1
         filename = f"{self.root}.{self._current_index}.{self.ext}"
         self._current_filename = os.path.join(self.directory, filename)
@@ -90,6 +193,8 @@ class TempFilenameGenerator:
     @property
     def current_index(self):
         """Get the current index value."""
+        if self._current_index is None:
+            self._current_index = self._find_max_index()
         return self._current_index
 
     @property
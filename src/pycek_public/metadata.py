@@ -0,0 +1,97 @@
+import functools
+from collections import OrderedDict
+
+# Values that cannot change in place, so assigning the same object again leaves its line valid
+_IMMUTABLE = frozenset({str, int, float, complex, bool, bytes, type(None)})
+
+
+@functools.lru_cache(maxsize=256)
+def format_label(key):
+    """Label written for a metadata key, e.g. "student_ID" -> "Student ID"."""
+    label = key.replace("_", " ")
+    return label[0].upper() + label[1:]
+
+
+class Metadata(OrderedDict):
+    """
+    Ordered metadata of a lab which caches its serialised form.
+
+    The "Label = value" line of a key is formatted the first time it is
+    needed and kept until the key is assigned a different value or removed,
+    and the whole comment block is kept until any key changes. Assigning the
+    same immutable value (e.g. a number or a string) again does not
+    invalidate anything; any other assignment does, since a list or an
+    array may have been changed in place.
+
+    Example:
+        metadata = Metadata(student_ID=123456789, laboratory="Crystal Violet Lab")
+        metadata.block()     # "# Student ID = 123456789\n# Laboratory = Crystal Violet Lab\n"
+        metadata["student_ID"] = 42
+        metadata.block()     # only the first line is formatted again
+    """
+    def __init__(self, *args, **kwargs):
+        self._lines = {}
+        self._block = None
+        super().__init__(*args, **kwargs)
+
+    def __setitem__(self, key, value):
+        if type(value) in _IMMUTABLE and key in self and OrderedDict.__getitem__(self, key) is value:
+            return
+        self._invalidate(key)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate(key)
+
+    def pop(self, key, *default):
+        self._invalidate(key)
+        return super().pop(key, *default)
+
+    def popitem(self, last=True):
+        key, value = super().popitem(last)
+        self._invalidate(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def move_to_end(self, key, last=True):
+        super().move_to_end(key, last)
+        self._block = None
+
+    def clear(self):
+        super().clear()
+        self._lines.clear()
+        self._block = None
+
+    def copy(self):
+        new = type(self)(self)
+        new._lines = self._lines.copy()
+        new._block = self._block
+        return new
+
+    def line(self, key):
+        """The "Label = value" line of *key* (without the comment marker)."""
+        line = self._lines.get(key)
+        if line is None:
+            line = self._lines[key] = f"{format_label(key)} = {self[key]}"
+        return line
+
+    def lines(self):
+        """The lines of every key, in order."""
+        return [self.line(key) for key in self]
+
+    def block(self, prefix="# "):
+        """All the lines as one string of comment lines, each ending with a newline."""
+        if prefix != "# ":
+            return "".join(f"{prefix}{line}\n" for line in self.lines())
+        if self._block is None:
+            self._block = "".join(f"# {line}\n" for line in self.lines())
+        return self._block
+
+    def _invalidate(self, key):
+        self._lines.pop(key, None)
+        self._block = None
@@ -0,0 +1,140 @@
+import copy
+
+_CONTAINERS = (dict, list, set)
+
+
+class Field:
+    """
+    Description of one lab parameter: its default value and what values it accepts.
+
+    Args:
+        default: Value given to new parameter objects (containers are copied)
+        kind (type or tuple): Accepted type(s); numbers.Real accepts any real number but not bool
+        minimum (float): Smallest accepted value, for numeric fields (default: no limit)
+        positive (bool): Reject zero as well as values below minimum (default: False)
+        optional (bool): Accept None (default: False)
+
+    Example:
+        Field(0.1, numbers.Real, minimum=0)
+    """
+    __slots__ = ("default", "kind", "minimum", "positive", "optional", "container", "_accepted")
+
+    def __init__(self, default=None, kind=object, minimum=None, positive=False, optional=False):
+        self.default = default
+        self.kind = kind
+        self.minimum = minimum
+        self.positive = positive
+        self.optional = optional
+        # Whether values may be changed in place (e.g. a dict of volumes)
+        kinds = kind if isinstance(kind, tuple) else (kind,)
+        self.container = isinstance(default, _CONTAINERS) or any(
+            isinstance(k, type) and issubclass(k, _CONTAINERS) for k in kinds
+        )
+        # Types already checked against kind (isinstance on numbers.Real is slow)
+        self._accepted = set()
+
+    def validate(self, name, value):
+        """Return value if it is acceptable for this field, raise otherwise."""
+        if value is None and self.optional:
+            return value
+        cls = type(value)
+        if cls not in self._accepted:
+            if not isinstance(value, self.kind) or (isinstance(value, bool) and self.kind is not bool):
+                raise TypeError(f"{name} must be {_describe(self.kind)}, got {cls.__name__}")
+            self._accepted.add(cls)
+        if self.minimum is not None:
+            if value < self.minimum or (self.positive and value == self.minimum):
+                bound = ">" if self.positive else ">="
+                raise ValueError(f"{name} must be {bound} {self.minimum}, got {value}")
+        return value
+
+
+def _describe(kind):
+    kinds = kind if isinstance(kind, tuple) else (kind,)
+    return " or ".join(getattr(k, "__name__", str(k)) for k in kinds)
+
+
+class LabParameters:
+    """
+    Base class of the compact parameter objects holding a lab's configuration.
+
+    Subclasses are created with make_parameters and store one slot per field,
+    so an instance has no __dict__. Every assignment is validated.
+    """
+    __slots__ = ()
+    _fields = {}
+
+    def __init__(self, **values):
+        for name, field in self._fields.items():
+            default = field.default
+            if isinstance(default, _CONTAINERS):
+                default = copy.copy(default)
+            object.__setattr__(self, name, default)
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    def __setattr__(self, name, value):
+        field = self._fields.get(name)
+        if field is None:
+            raise AttributeError(f"{type(self).__name__} has no parameter {name!r}")
+        object.__setattr__(self, name, field.validate(name, value))
+
+    def clone(self, **changes):
+        """
+        Return a copy with some fields changed.
+
+        Values are shared with the original except containers (e.g. a dict of
+        volumes), which are copied so that changing one object never affects
+        the other. The cost depends only on the number of fields.
+        """
+        new = object.__new__(type(self))
+        for name in self._fields:
+            value = getattr(self, name)
+            if isinstance(value, _CONTAINERS):
+                value = copy.copy(value)
+            object.__setattr__(new, name, value)
+        for name, value in changes.items():
+            setattr(new, name, value)
+        return new
+
+    def as_dict(self):
+        """Field values by name."""
+        return {name: getattr(self, name) for name in self._fields}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        values = ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items())
+        return f"{type(self).__name__}({values})"
+
+
+def make_parameters(name, fields, module=None, qualname=None):
+    """
+    Create a LabParameters subclass with one slot per field.
+
+    Args:
+        name (str): Name of the new class
+        fields (dict): Field descriptions by parameter name
+        module (str): __module__ of the new class (needed to pickle its instances)
+        qualname (str): __qualname__ of the new class (default: name)
+
+    Returns:
+        type: The new class
+
+    Example:
+        Parameters = make_parameters("Parameters", {"volume": Field(1.0, numbers.Real, minimum=0)})
+        params = Parameters(volume=2.0)
+        other = params.clone(volume=3.0)
+    """
+    namespace = {
+        "__slots__": tuple(fields),
+        "_fields": dict(fields),
+        "__qualname__": qualname or name,
+    }
+    if module is not None:
+        namespace["__module__"] = module
+    return type(name, (LabParameters,), namespace)
+
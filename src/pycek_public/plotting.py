@@ -1,10 +1,63 @@
-import matplotlib.pyplot as plt
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from io import BytesIO
+
 import numpy as np
-from scipy import stats
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import pycek_public as cek
+
+# Rendered images are cached by content, so re-displaying or downloading the
+# same experiment does not re-rasterise the figure
+_IMAGE_FORMATS = ("png", "svg")
+_figure_bytes_cache = weakref.WeakKeyDictionary()
+
+
+def figure_to_bytes(fig, fmt="png", dpi=100, **kwargs):
+    """
+    Render an existing figure to PNG or SVG bytes, caching the result on the figure.
+
+    The cache assumes the figure is not modified after the first call,
+    which holds for the figures the marimo notebooks create in each cell run.
+
+    Parameters:
+        fig (Figure): Matplotlib figure to render
+        fmt (str): Either "png" or "svg" (default is "png")
+        dpi (int): Resolution of the rasterised image (default is 100)
+        **kwargs: Extra keyword arguments forwarded to savefig (e.g. bbox_inches)
+
+    Returns:
+        bytes: The encoded image
+    """
+    if fmt not in _IMAGE_FORMATS:
+        raise ValueError(f"fmt must be one of {_IMAGE_FORMATS}, got {fmt!r}")
+
+    key = (fmt, dpi, tuple(sorted(kwargs.items())))
+    cached = _figure_bytes_cache.setdefault(fig, {})
+    if key not in cached:
+        buf = BytesIO()
+        fig.savefig(buf, format=fmt, dpi=dpi, **kwargs)
+        cached[key] = buf.getvalue()
+    return cached[key]
+
+
+def _render_in_worker(scatter, line, columns, hline, fmt, dpi):
+    """Render a quick_plot image in a pool worker."""
+    return plotting()._render_image(scatter, line, columns, hline, fmt, dpi)
+
 
 class plotting():
 
-    def quick_plot(self, scatter=None, line=None, columns=["X", "Y"], output=None, hline=None):
+    # Shared by all instances, the notebooks create a new plotting object on every run
+    cache_size = 64
+    _image_cache = OrderedDict()
+    # The marimo sessions run in different threads
+    _cache_lock = threading.Lock()
+
+    def quick_plot(self, scatter=None, line=None, columns=["X", "Y"], output=None, hline=None, dpi=100):
         """
         Plot the data along with the best fit line and its associated confidence band using
         Matplotlib's object-oriented API to avoid race conditions.
@@ -13,11 +66,14 @@ class plotting():
             scatter (list or array): Data to plot as scatter points
             line (list or array): Data to plot as lines
             columns (list): Axes labels (default is ["X","Y"])
-            output (str): If provided, save figure to this path. If "marimo", return the figure object
+            output (str): If provided, save figure to this path. If "marimo", return the figure object.
+                          If "png" or "svg", return the rendered image as bytes (see render)
             hline (float): If provided, add a horizontal line at this y-value
+            dpi (int): Resolution used when output is "png" or "svg" (default is 100)
     
         Returns:
-            None or Figure: Displays a matplotlib plot or returns the figure object if output="marimo"
+            None, Figure or bytes: Displays a matplotlib plot, returns the figure object if output="marimo",
+                                   or the encoded image if output is "png" or "svg"
     
         Example:
             >>> quick_plot(scatter=x_data, line=y_data)
@@ -26,15 +82,133 @@ class plotting():
         if scatter is None and line is None:
             raise ValueError("Either scatter or line should be provided")
     
+        if output in _IMAGE_FORMATS:
+            return self.render(scatter=scatter, line=line, columns=columns, hline=hline, fmt=output, dpi=dpi)
+
+        # pyplot is only needed here, the image outputs above do without it
+        import matplotlib.pyplot as plt
+
+        # Create figure and axes objects (OO approach)
+        fig, ax = plt.subplots(figsize=(6, 6))
+        self._draw(ax, scatter, line, columns, hline)
+    
+        # Handle output
+        if output is None:
+            # Use this instead of plt.show() to avoid blocking behavior
+            fig.canvas.draw_idle()
+            plt.show(block=False)
+        elif output == "marimo":
+            return fig
+        else:
+            # Save the figure to the specified path
+            fig.savefig(output)
+    
+        # Close the figure to free memory if not returning it
+        if output != "marimo":
+            plt.close(fig)
+
+    def render(self, scatter=None, line=None, columns=["X", "Y"], hline=None, fmt="png", dpi=100):
+        """
+        Rasterise the plot straight to PNG or SVG bytes without going through pyplot.
+
+        The figure is drawn on a standalone Agg canvas, and the encoded image is cached
+        using a hash of the data, the labels and the output options, so asking again for
+        the same plot returns the cached bytes.
+
+        Parameters:
+            scatter, line, columns, hline: Same as quick_plot
+            fmt (str): Either "png" or "svg" (default is "png")
+            dpi (int): Resolution of the rasterised image (default is 100)
+
+        Returns:
+            bytes: The encoded image
+        """
+        if scatter is None and line is None:
+            raise ValueError("Either scatter or line should be provided")
+        if fmt not in _IMAGE_FORMATS:
+            raise ValueError(f"fmt must be one of {_IMAGE_FORMATS}, got {fmt!r}")
+
+        key = self._cache_key(scatter, line, columns, hline, fmt, dpi)
+        image = self._lookup(key)
+        if image is not None:
+            return image
+
+        image = self._render_image(scatter, line, columns, hline, fmt, dpi)
+        self._store(key, image)
+        return image
+
+    async def aquick_plot(self, scatter=None, line=None, columns=["X", "Y"], output="png", hline=None, dpi=100):
+        """
+        Asynchronous version of quick_plot for the "png" and "svg" outputs.
+
+        Cached images are returned straight away; otherwise the figure is
+        rendered in the shared process pool (see run_in_pool), so the event
+        loop is not blocked while matplotlib draws.
+        """
+        if scatter is None and line is None:
+            raise ValueError("Either scatter or line should be provided")
+        if output not in _IMAGE_FORMATS:
+            raise ValueError(f"output must be one of {_IMAGE_FORMATS}, got {output!r}")
+
+        key = self._cache_key(scatter, line, columns, hline, output, dpi)
+        image = self._lookup(key)
+        if image is not None:
+            return image
+
+        image = await cek.run_in_pool(_render_in_worker, scatter, line, columns, hline, output, dpi)
+        self._store(key, image)
+        return image
+
+    def _render_image(self, scatter, line, columns, hline, fmt, dpi):
+        """Draw the plot on a standalone Agg canvas and return the encoded image."""
+        fig = Figure(figsize=(6, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        self._draw(ax, scatter, line, columns, hline)
+
+        buf = BytesIO()
+        fig.savefig(buf, format=fmt, dpi=dpi)
+        return buf.getvalue()
+
+    def _lookup(self, key):
+        """Cached image for key (marked as most recently used), or None."""
+        with plotting._cache_lock:
+            image = plotting._image_cache.get(key)
+            if image is not None:
+                plotting._image_cache.move_to_end(key)
+            return image
+
+    def _store(self, key, image):
+        with plotting._cache_lock:
+            cache = plotting._image_cache
+            cache[key] = image
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def _cache_key(self, scatter, line, columns, hline, fmt, dpi):
+        """Hash the plotted data and every option that changes the rendered image."""
+        h = hashlib.blake2b(digest_size=20)
+        h.update(repr((list(columns), hline, fmt, dpi)).encode())
+        for tag, datasets in (("scatter", scatter), ("line", line)):
+            if not isinstance(datasets, list):
+                datasets = [datasets]
+            for ds in datasets:
+                h.update(tag.encode())
+                if ds is None:
+                    continue
+                ds = np.ascontiguousarray(ds)
+                h.update(repr((ds.shape, ds.dtype.str)).encode())
+                h.update(ds.tobytes())
+        return h.hexdigest()
+
+    def _draw(self, ax, scatter, line, columns, hline):
+        """Draw the datasets, labels and watermark on *ax*."""
         # Convert inputs to lists if they aren't already
         if not isinstance(scatter, list):
             scatter = [scatter] if scatter is not None else []
         if not isinstance(line, list):
             line = [line] if line is not None else []
     
-        # Create figure and axes objects (OO approach)
-        fig, ax = plt.subplots(figsize=(6, 6))
-    
         # Plot scatter data
         idx = 0
         for ds in scatter:
@@ -63,19 +237,3 @@ class plotting():
         ax.text(0.5, 0.5, 'TEMPLATE', transform=ax.transAxes,
                 fontsize=40, color='gray', alpha=0.5,
                 ha='center', va='center', rotation=30)
-    
-        # Handle output
-        if output is None:
-            # Use this instead of plt.show() to avoid blocking behavior
-            fig.canvas.draw_idle()
-            plt.show(block=False)
-        elif output == "marimo":
-            return fig
-        else:
-            # Save the figure to the specified path
-            fig.savefig(output)
-    
-        # Close the figure to free memory if not returning it
-        if output != "marimo":
-            plt.close(fig)
-
@@ -3,6 +3,13 @@ from scipy.optimize import curve_fit
 from scipy.integrate import trapezoid
 import matplotlib.pyplot as plt
 
+import pycek_public as cek
+
+
+def _fit_in_worker(fitter, args, kwargs):
+    """Run a fit in a pool worker and send back the updated fitter state."""
+    popt = fitter.fit(*args, **kwargs)
+    return popt, fitter.__dict__
 
 class RamanFitter:
     def __init__(self, wavenumbers, intensities):
@@ -127,6 +134,18 @@ class RamanFitter:
             print(f"Fitting failed: {e}")
             return None
     
+    async def afit(self, *args, **kwargs):
+        """
+        Asynchronous version of fit, taking the same arguments.
+
+        The fit runs in the shared process pool (see run_in_pool), so long
+        fits do not block the notebook and several fits can run at once.
+        On return the fitter holds the same results as after fit().
+        """
+        popt, state = await cek.run_in_pool(_fit_in_worker, self, args, kwargs)
+        self.__dict__.update(state)
+        return popt
+
     def _estimate_initial_params(self, x, y, n_peaks, include_background):
         """Estimate initial parameters from data."""
         # Find peaks
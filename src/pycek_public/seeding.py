@@ -0,0 +1,60 @@
+import hashlib
+
+import numpy as np
+
+
+def _name_to_int(name):
+    """Stable integer for a name (unlike hash(), identical in every process)."""
+    return int.from_bytes(hashlib.blake2b(str(name).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _state_to_ID(seed_sequence):
+    low, high = seed_sequence.generate_state(2, dtype=np.uint32)
+    return int(low) | (int(high) << 32)
+
+
+def derive_sample_ID(course, student_ID, lab, attempt=0):
+    """
+    64-bit sample ID for an attempt of a student at a lab.
+
+    The ID comes from a numpy SeedSequence with the course as entropy and
+    (student_ID, lab, attempt) as spawn key, so every combination gets an
+    independent stream, and any process or machine derives the same ID
+    for the same combination without coordination.
+
+    Args:
+        course (str): Course name, e.g. "CHEM2000"
+        student_ID (int): Student number
+        lab (str): Lab name, e.g. "crystal_violet"
+        attempt (int): Attempt number (default: 0)
+
+    Returns:
+        int: Sample ID in [0, 2**64)
+    """
+    seed_sequence = np.random.SeedSequence(
+        entropy=_name_to_int(course),
+        spawn_key=(int(student_ID), _name_to_int(lab), int(attempt)),
+    )
+    return _state_to_ID(seed_sequence)
+
+
+def fresh_sample_ID():
+    """New 64-bit sample ID from operating system entropy."""
+    return _state_to_ID(np.random.SeedSequence())
+
+
+def seed_global_rng(sample_ID):
+    """
+    Seed numpy's global RNG from a sample ID.
+
+    IDs below 2**32 seed it exactly as np.random.seed(sample_ID) always has,
+    so existing sample IDs reproduce the same data; larger IDs are split
+    into two 32-bit words.
+    """
+    sample_ID = int(sample_ID)
+    if not 0 <= sample_ID < 2**64:
+        raise ValueError(f"sample_ID must be in [0, 2**64), got {sample_ID}")
+    if sample_ID < 2**32:
+        np.random.seed(sample_ID)
+    else:
+        np.random.seed(np.array([sample_ID & 0xFFFFFFFF, sample_ID >> 32], dtype=np.uint32))
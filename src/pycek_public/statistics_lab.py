@@ -1,6 +1,13 @@
 import pycek_public as cek
 import numpy as np
 
+# Model functions live at module level so that labs can be pickled (e.g. for run_in_pool)
+def _linear(x, m, q):
+    return m*x + q
+
+def _murnaghan(x, E0, K0, Kp, V0):
+    return E0 + K0 * x / Kp * ( (V0/x)**Kp / (Kp-1)+1) - K0*V0/(Kp-1)
+
 class stats_lab(cek.cek_labs):
     def setup_lab(self):
         """
@@ -23,6 +30,7 @@ class stats_lab(cek.cek_labs):
         ]
     
         self.sample_parameters['Averages'] = {
+            "generator" : "normal",
             "gen_values" : [
                 (1.0, 0.1),
                 (12., 2.0)
@@ -32,6 +40,7 @@ class stats_lab(cek.cek_labs):
             }
         
         self.sample_parameters['Propagation of uncertainty'] = {
+            "generator" : "normal",
             "gen_values" : [
                 (15.0, 1.0),
                 (133., 2.0)
@@ -40,6 +49,7 @@ class stats_lab(cek.cek_labs):
             }
 
         self.sample_parameters['Comparison of averages'] = {
+            "generator" : "normal",
             "gen_values" : [
                 (15.0, 1.0),
                 (13.2, 2.0)
@@ -48,7 +58,9 @@ class stats_lab(cek.cek_labs):
             }
 
         self.sample_parameters['Linear fit'] = {
-            "function" : lambda x,m,q: m*x + q, 
+            "generator" : "function",
+            "function" : _linear,
+            "noise" : 5,
             "gen_values" : {'m':12.3 , 'q':1.0},
             "xrange" : [0.0 , 10.0],
             "expected_value" : (11.3,0.9),
@@ -57,14 +69,17 @@ class stats_lab(cek.cek_labs):
 
         self.sample_parameters['Non linear fit'] = {
             "nval" : 10,
-            "function" : lambda x,E0,K0,Kp,V0:  E0 + K0 * x / Kp * ( (V0/x)**Kp / (Kp-1)+1) - K0*V0/(Kp-1), 
+            "generator" : "function",
+            "function" : _murnaghan,
+            "noise" : 5,
             "gen_values" : {"E0":-634.2, "K0":12.43, "Kp":4.28, "V0":99.11},
             "xrange" : [50 , 140],
             "precision" : 3,
         }
         
         self.sample_parameters['Detection of outliers'] = {
-            "function" : lambda x,m,q: m*x + q, 
+            "generator" : "function",
+            "function" : _linear,
             "gen_values" : {'m':2.3 , 'q':0.1},
             "xrange" : [10.0 , 20.0],
             "shift" : 2,
@@ -75,6 +90,28 @@ class stats_lab(cek.cek_labs):
         """
         Generate the data
         """
+        data = self.create_datasets(1)[0]
+        if data.shape[1] == 1:
+            data = data[:, 0]
+
+        self.data = data
+        return data
+
+    def create_datasets(self, n_datasets):
+        """
+        Generate n_datasets independent datasets for the current sample at once.
+
+        The generator and its settings are taken from the sample_parameters
+        table, and every dataset is drawn in the same vectorised calls. With
+        n_datasets = 1 the random numbers are used in the same order as
+        generating a single dataset, so existing sample IDs reproduce the
+        same data.
+
+        Returns
+        -------
+        np.ndarray
+            Shape (n_datasets, number_of_values, ncolumns) array.
+        """
         if self.sample is None:
             raise Exception("Sample not defined")
 
@@ -97,43 +134,29 @@ class stats_lab(cek.cek_labs):
 
         if "expected_value" in prm:
             self.add_metadata( **{"expected_value": prm["expected_value"]} )
-        
-        if self.sample in ["Averages", 'Propagation of uncertainty', 'Comparison of averages']:
-            data = self._generate_normal_random(self.number_of_values, prm['gen_values'])
-
-        elif self.sample in ["Linear fit"]:
-            self.noise_level = 5
-
-            data = self.generate_data_from_function(
-                prm["function"], 
-                prm['gen_values'], 
-                self.number_of_values,
-                prm['xrange'], 
-                noise_level = self.noise_level,
-                )
-
-        elif self.sample in ["Non linear fit"]:
-            self.noise_level = 5
-
-            data = self.generate_data_from_function(
-                prm["function"], 
-                prm['gen_values'], 
-                self.number_of_values,
-                prm['xrange'], 
-                noise_level = self.noise_level,
-                )
-        
-        elif self.sample in ["Detection of outliers"]:
-            data = self.generate_data_from_function(
-                prm["function"], 
-                prm['gen_values'], 
-                self.number_of_values,
-                prm['xrange'], 
-                noise_level = self.noise_level,
-                )
-            i = np.random.randint(self.number_of_values)
-            data[i,1] += prm['shift']
 
-        self.data = data
-        return data            
+        generator = getattr(self, f"_{prm['generator']}_datasets")
+        data = generator(prm, n_datasets, self.number_of_values)
+
+        if "shift" in prm:
+            # One outlier per dataset
+            rows = np.random.randint(self.number_of_values, size=n_datasets)
+            data[np.arange(n_datasets), rows, 1] += prm['shift']
+
+        return data
+
+    def _normal_datasets(self, prm, n_datasets, n):
+        """One column per (mean, std) pair."""
+        return self._generate_normal_random(n, prm['gen_values'], n_datasets)
+
+    def _function_datasets(self, prm, n_datasets, n):
+        """Sorted random x in xrange and y = function(x) plus noise."""
+        data = np.empty((n_datasets, n, 2))
+        x = self._generate_uniform_random(*prm['xrange'], (n_datasets, n))
+        x.sort(axis=1)
+        data[..., 0] = x
 
+        y = prm["function"](x, **prm['gen_values'])
+        y += self._generate_noise((n_datasets, n), self.noise_level)
+        self._round_values(y, out=data[..., 1])
+        return data
@@ -1,7 +1,21 @@
+import numbers
+
 import pycek_public as cek
 import numpy as np
 
+COLUMNS = ["Dye added (mg)", "Dye in solution (mol/L)"]
+
+# Dye left in solution for a Langmuir isotherm (positive root of the mass balance)
+def _langmuir(x, K, Q):
+    return ((x*K - K*Q - 1) + np.sqrt((x*K - K*Q - 1)**2 + 4*x*K) ) / (2*K)
+
 class surface_adsorption(cek.cek_labs):
+    parameter_fields = {
+        "volume": cek.Field(1, numbers.Real, minimum=0, positive=True),
+        "minDye": cek.Field(500, numbers.Real, minimum=0),
+        "maxDye": cek.Field(10000, numbers.Real, minimum=0),
+    }
+
     def setup_lab(self):
         """
         Define base information for the lab.
@@ -10,7 +24,7 @@ class surface_adsorption(cek.cek_labs):
         """
         self.add_metadata( 
             laboratory = 'Surface Adsorption Lab',
-            columns = ["Dye added (mg)", "Dye in solution (mol/L)"]
+            columns = COLUMNS
             )
         
         self.volume = 1 # L
@@ -38,6 +52,7 @@ class surface_adsorption(cek.cek_labs):
             )
 
         self.add_metadata(**{
+            "columns"            : COLUMNS,
             "Temperature (C)"    : self.temperature - 273.15,
             "Volume (L)"         : self.volume,
             "Molar mass (g/mol)" : self.sample_parameters["molarMass"],
@@ -55,7 +70,7 @@ class surface_adsorption(cek.cek_labs):
         conc_range = np.array([self.minDye, self.maxDye]) / conversion_factor
 
         self.data = self.generate_data_from_function(
-                lambda x,K,Q: ((x*K - K*Q - 1) + np.sqrt((x*K - K*Q - 1)**2 + 4*x*K) ) / (2*K) , 
+                _langmuir, 
                 {"K":K , "Q":self.sample_parameters["Q"]}, 
                 self.number_of_values,
                 xrange = conc_range, 
@@ -68,3 +83,70 @@ class surface_adsorption(cek.cek_labs):
 
         return self.data
 
+    def create_isotherms(self, temperatures, volumes=None, minDye=None, maxDye=None, sample_ID=None, attempt=None):
+        """
+        Generate a family of isotherms, one per temperature, in one go.
+
+        volumes, minDye and maxDye default to the lab's values and may be
+        scalars or arrays; they are broadcast against the temperatures (K).
+        The random numbers are drawn in the same order as calling
+        create_data once per temperature.
+
+        The RNG is seeded from sample_ID or attempt as in create_data_for_lab
+        and the seed is recorded as sample_ID in the metadata; calling
+        create_isotherms again with the same arguments and that sample_ID
+        reproduces the isotherms.
+
+        self.data is set to the combined (m * n, 3) table with the
+        temperature as first column, ready to be written to one file.
+
+        Returns
+        -------
+        np.ndarray
+            Shape (m, n, 2) array with the isotherm at each temperature.
+        """
+        T, volume, low, high = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(temperatures, dtype=float)),
+            self.volume if volumes is None else np.asarray(volumes, dtype=float),
+            self.minDye if minDye is None else np.asarray(minDye, dtype=float),
+            self.maxDye if maxDye is None else np.asarray(maxDye, dtype=float),
+        )
+        if T.ndim != 1:
+            raise ValueError("temperatures, volumes and dye ranges must broadcast to a 1D array")
+        m, n = len(T), self.number_of_values
+
+        self._seed_rng(sample_ID, attempt)
+
+        self.set_parameters( 
+            sample = self.sample,
+            number_of_values = self.number_of_values,
+            )
+
+        self.add_metadata(**{
+            "columns"            : ["Temperature (K)"] + COLUMNS,
+            "Temperature (C)"    : (T - 273.15).tolist(),
+            "Volume (L)"         : volume.tolist(),
+            "Molar mass (g/mol)" : self.sample_parameters["molarMass"],
+            "MinDye (mg)"        : low.tolist(),
+            "MaxDye (mg)"        : high.tolist(),
+            'Number of values'   : self.number_of_values,
+        })
+
+        lnK = (-self.sample_parameters["dH"] / T + self.sample_parameters["dS"]) / self.R
+        K = np.exp(lnK)[:, None]
+
+        conversion_factor = (1000 * self.sample_parameters["molarMass"] * volume)[:, None]
+        x = np.linspace(low / conversion_factor[:, 0], high / conversion_factor[:, 0], n, axis=-1)
+
+        y = _langmuir(x, K, self.sample_parameters["Q"])
+        y += self._generate_noise((m, n), self.noise_level)
+        eps = np.power(10.0, -self.precision)
+        np.fmax(np.abs(y, out=y), eps, out=y)
+
+        isotherms = np.empty((m, n, 2))
+        np.multiply(x, conversion_factor, out=isotherms[..., 0])
+        self._round_values(y, out=isotherms[..., 1])
+
+        self.data = np.column_stack((np.repeat(T, n), isotherms.reshape(-1, 2)))
+        return isotherms
+